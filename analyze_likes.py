@@ -4,20 +4,27 @@ Instagram Post Likes Analyzer
 Genera un consolidado de likes por post del archivo JSON de Instagram
 """
 
-import json
 import datetime
 from typing import List, Dict, Any
 import os
 
+import numpy as np
+
+from dataset_summary import is_current
+from engagement_analytics import (METRIC_FIELDS, WEEKDAYS, PostMetrics, by_media_type, by_month, by_weekday_hour,
+                                  engagement_rate, percentiles, rolling_average, summary)
+from media import media_label
+from streaming_loader import load_data, load_summary
+
 def load_instagram_data(filename: str) -> Dict[Any, Any]:
     """Carga los datos del archivo JSON de Instagram"""
     try:
-        with open(filename, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        # Solo se decodifican los campos que usa el reporte
+        return load_data(filename, fields=METRIC_FIELDS)
     except FileNotFoundError:
         print(f"❌ Error: No se encontró el archivo {filename}")
         return {}
-    except json.JSONDecodeError:
+    except ValueError:
         print(f"❌ Error: El archivo {filename} no tiene un formato JSON válido")
         return {}
 
@@ -25,8 +32,28 @@ def format_date(timestamp: int) -> str:
     """Convierte timestamp a fecha legible"""
     return datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')
 
-def analyze_likes_by_post(data: Dict[Any, Any]) -> None:
-    """Analiza y muestra el consolidado de likes por post"""
+def general_stats(stored: Dict[Any, Any], metrics: PostMetrics):
+    """Totales, extremos y promedios por tipo: del resumen guardado si está al día, si no de las columnas"""
+    if is_current(stored) and stored['posts'] == len(metrics):
+        totals = {
+            'total_likes': stored['total_likes'],
+            'avg_likes': stored['total_likes'] / stored['posts'],
+            'max': (stored['max_likes']['like_count'], stored['max_likes']['code']),
+            'min': (stored['min_likes']['like_count'], stored['min_likes']['code']),
+        }
+        by_type = {
+            media_label(int(media_type)): {'count': entry['count'], 'avg_likes': entry['likes'] / entry['count']}
+            for media_type, entry in stored['by_media_type'].items()
+        }
+        return totals, by_type
+    return summary(metrics), by_media_type(metrics)
+
+def analyze_likes_by_post(data: Dict[Any, Any], stored_summary: Dict[Any, Any] = None) -> None:
+    """Analiza y muestra el consolidado de likes por post
+
+    stored_summary: resumen leído con load_summary() (por defecto, el de data['metadata']).
+    Los posts solo se usan en las secciones que necesitan datos por post.
+    """
     
     if not data or 'posts' not in data:
         print("❌ No se encontraron datos de posts en el archivo")
@@ -48,80 +75,72 @@ def analyze_likes_by_post(data: Dict[Any, Any]) -> None:
     # Ordenar posts por fecha (más recientes primero)
     sorted_posts = sorted(posts, key=lambda x: x.get('taken_at', 0), reverse=True)
     
-    total_likes = 0
-    post_counter = 1
-    
     print("📋 DETALLE POR POST:")
     print("-" * 80)
     print(f"{'#':<3} {'Fecha':<16} {'Likes':<6} {'Comentarios':<11} {'Código':<11} {'Tipo'}")
     print("-" * 80)
     
-    for post in sorted_posts:
-        post_id = post.get('id', 'N/A')
+    for post_counter, post in enumerate(sorted_posts, 1):
         code = post.get('code', 'N/A')
         likes = post.get('like_count', 0)
         comments = post.get('comment_count', 0)
         taken_at = post.get('taken_at', 0)
-        media_type = post.get('media_type', 0)
-        
-        # Determinar tipo de contenido
-        if media_type == 1:
-            content_type = "Imagen"
-        elif media_type == 2:
-            content_type = "Video"
-        elif media_type == 8:
-            content_type = "Carrusel"
-        else:
-            content_type = f"Tipo {media_type}"
+        content_type = media_label(post.get('media_type', 0))
         
         date_str = format_date(taken_at) if taken_at else "N/A"
         
         print(f"{post_counter:<3} {date_str:<16} {likes:<6} {comments:<11} {code:<11} {content_type}")
-        
-        total_likes += likes
-        post_counter += 1
     
     print("-" * 80)
     
-    # Estadísticas generales
+    # Estadísticas generales: del resumen guardado (mantenido en cada guardado incremental)
+    # o de columnas NumPy; las secciones por mes, hora y distribución sí recorren los posts
     if posts:
-        avg_likes = total_likes / len(posts)
-        max_likes_post = max(posts, key=lambda x: x.get('like_count', 0))
-        min_likes_post = min(posts, key=lambda x: x.get('like_count', 0))
+        metrics = PostMetrics.from_posts(posts)
+        stored = stored_summary if stored_summary is not None else data.get('metadata', {}).get('summary')
+        totals, by_type = general_stats(stored, metrics)
         
         print("\n📈 ESTADÍSTICAS GENERALES:")
         print("-" * 40)
-        print(f"💯 Total de likes: {total_likes:,}")
-        print(f"📊 Promedio de likes por post: {avg_likes:.1f}")
-        print(f"🔝 Post con más likes: {max_likes_post.get('like_count', 0)} likes (Código: {max_likes_post.get('code', 'N/A')})")
-        print(f"🔻 Post con menos likes: {min_likes_post.get('like_count', 0)} likes (Código: {min_likes_post.get('code', 'N/A')})")
-        
-        # Análisis por tipo de contenido
-        content_stats = {}
-        for post in posts:
-            media_type = post.get('media_type', 0)
-            likes = post.get('like_count', 0)
-            
-            if media_type == 1:
-                content_type = "Imagen"
-            elif media_type == 2:
-                content_type = "Video"
-            elif media_type == 8:
-                content_type = "Carrusel"
-            else:
-                content_type = f"Tipo {media_type}"
-            
-            if content_type not in content_stats:
-                content_stats[content_type] = {'count': 0, 'total_likes': 0}
-            
-            content_stats[content_type]['count'] += 1
-            content_stats[content_type]['total_likes'] += likes
+        print(f"💯 Total de likes: {totals['total_likes']:,}")
+        print(f"📊 Promedio de likes por post: {totals['avg_likes']:.1f}")
+        print(f"🔝 Post con más likes: {totals['max'][0]} likes (Código: {totals['max'][1]})")
+        print(f"🔻 Post con menos likes: {totals['min'][0]} likes (Código: {totals['min'][1]})")
         
         print(f"\n🎯 ANÁLISIS POR TIPO DE CONTENIDO:")
         print("-" * 40)
-        for content_type, stats in content_stats.items():
-            avg = stats['total_likes'] / stats['count'] if stats['count'] > 0 else 0
-            print(f"{content_type}: {stats['count']} posts, {avg:.1f} likes promedio")
+        for content_type, type_stats in by_type.items():
+            print(f"{content_type}: {type_stats['count']} posts, {type_stats['avg_likes']:.1f} likes promedio")
+        
+        print("\n🗓️ LIKES POR MES:")
+        print("-" * 40)
+        for month, month_stats in by_month(metrics).items():
+            print(f"{month}: {month_stats['count']} posts, {month_stats['total_likes']:,} likes, "
+                  f"{month_stats['avg_likes']:.1f} promedio")
+        
+        counts, averages = by_weekday_hour(metrics)
+        if counts.any():
+            print("\n⏰ MEJORES DÍAS Y HORAS (promedio de likes):")
+            print("-" * 40)
+            best = np.argsort(-averages, axis=None, kind='stable')
+            for cell in best[:5]:
+                day, hour = divmod(int(cell), 24)
+                if counts[day, hour]:
+                    print(f"{WEEKDAYS[day]} {hour:02d}:00: {averages[day, hour]:.1f} likes ({counts[day, hour]} posts)")
+        
+        rates = engagement_rate(metrics, profile.get('followers_count'))
+        if rates is not None:
+            print("\n💬 ENGAGEMENT SOBRE SEGUIDORES:")
+            print("-" * 40)
+            print(f"Promedio: {rates.mean():.2f}%")
+            print("Percentiles: " + ", ".join(f"p{p} {value:.2f}%" for p, value in percentiles(rates).items()))
+        
+        print("\n📐 DISTRIBUCIÓN DE LIKES:")
+        print("-" * 40)
+        print("Percentiles: " + ", ".join(f"p{p} {value:.1f}" for p, value in percentiles(metrics.likes).items()))
+        rolling = rolling_average(metrics)
+        if len(rolling):
+            print(f"Media móvil (7 posts): última {rolling[-1]:.1f}, máxima {rolling.max():.1f}, mínima {rolling.min():.1f}")
 
 def main():
     """Función principal"""
@@ -134,10 +153,12 @@ def main():
         return
     
     print("🔍 Cargando datos de Instagram...")
+    # El resumen va antes de los posts: totales y extremos sin recorrerlos
+    stored_summary = load_summary(json_file)
     data = load_instagram_data(json_file)
     
     if data:
-        analyze_likes_by_post(data)
+        analyze_likes_by_post(data, stored_summary)
     else:
         print("❌ No se pudieron cargar los datos")
 
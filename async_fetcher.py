@@ -0,0 +1,162 @@
+"""
+Motor asíncrono para extraer comentarios, likes y respuestas de varios posts a la vez
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RequestBudgetExceeded(Exception):
+    """Se agotó el presupuesto global de requests"""
+
+
+class RequestBudget:
+    """Presupuesto global de requests compartido por todas las tareas concurrentes"""
+
+    def __init__(self, max_requests=None):
+        self.max_requests = max_requests
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def consume(self):
+        """Descuenta un request del presupuesto o lanza RequestBudgetExceeded"""
+        with self._lock:
+            if self.max_requests is not None and self.used >= self.max_requests:
+                raise RequestBudgetExceeded(f"Request budget of {self.max_requests} exhausted")
+            self.used += 1
+
+    @property
+    def exhausted(self):
+        with self._lock:
+            return self.max_requests is not None and self.used >= self.max_requests
+
+    @property
+    def remaining(self):
+        with self._lock:
+            if self.max_requests is None:
+                return None
+            return max(self.max_requests - self.used, 0)
+
+
+class AsyncDetailFetcher:
+    """Extrae los detalles de muchos posts en paralelo con un límite de concurrencia.
+
+    Cada página de comentarios, likes o respuestas sigue pasando por los métodos
+    de InstagramAPI; aquí solo se reparten en un pool de hilos controlado desde
+    asyncio, de modo que como máximo `concurrency` requests están en vuelo.
+    Con un ScrapeCheckpoint, los posts ya completados se toman del journal y los
+    paginadores a medias continúan desde su último cursor. Con un
+    IncrementalDataManager, solo se piden comentarios y likes que aún no existen.
+    on_post_done(post) se llama cuando un post tiene todos sus detalles.
+    Los posts que terminan con el presupuesto agotado pueden tener detalles
+    truncados: quedan sin comments_detailed/likes_detailed y sus ids en `skipped`.
+    """
+
+    def __init__(self, api, concurrency=4, gui_logger=None, checkpoint=None, data_manager=None, on_post_done=None):
+        self.api = api
+        self.concurrency = max(1, int(concurrency))
+        self.checkpoint = checkpoint
+        self.data_manager = data_manager
+        self.on_post_done = on_post_done
+        self.skipped = set()
+        self._log_lock = threading.Lock()
+        self._gui_logger = gui_logger
+
+    def log(self, message):
+        # Los métodos del API loguean desde hilos del pool; serializar la salida
+        if self._gui_logger:
+            with self._log_lock:
+                self._gui_logger(message)
+
+    def _budget_exhausted(self):
+        budget = getattr(self.api, 'request_budget', None)
+        return budget is not None and budget.exhausted
+
+    async def fetch_details(self, posts, extract_comments=True, extract_likes=True,
+                            extract_replies=True, max_comments=100, max_likes=50):
+        """Rellena comments_detailed/likes_detailed de cada post y devuelve la lista"""
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        total = len(posts)
+        completed = 0
+
+        async def run_job(func, *args, **kwargs):
+            async with semaphore:
+                if self._budget_exhausted():
+                    return []
+                return await loop.run_in_executor(executor, lambda: func(*args, **kwargs))
+
+        async def fetch_comments(post):
+            known = {}
+            if self.data_manager:
+                known = {
+                    'known_ids': self.data_manager.get_existing_comment_ids(post['id']),
+                    'min_created_at': self.data_manager.get_latest_comment_created_at(post['id'])
+                }
+            comments = await run_job(self.api.get_post_comments, post['id'], max_comments, self.log,
+                                     fetch_replies=False, checkpoint=self.checkpoint, **known)
+            if extract_replies:
+                pending = [c for c in comments if c.get('child_comment_count', 0) > 0]
+                replies = await asyncio.gather(*(
+                    run_job(self.api.get_comment_replies, c['id'], self.log) for c in pending
+                ))
+                for comment, comment_replies in zip(pending, replies):
+                    comment['replies'] = comment_replies
+            return comments
+
+        async def process_post(post):
+            nonlocal completed
+            journaled = self.checkpoint.get_completed_post(post['id']) if self.checkpoint else None
+            if journaled:
+                post.update(journaled)
+                completed += 1
+                if self.on_post_done:
+                    self.on_post_done(post)
+                return post
+
+            jobs = []
+            if extract_comments:
+                jobs.append(fetch_comments(post))
+            if extract_likes:
+                known = {}
+                if self.data_manager:
+                    known = {'known_usernames': self.data_manager.get_existing_like_usernames(post['id'])}
+                jobs.append(run_job(self.api.get_post_likes, post['id'], max_likes, self.log,
+                                    checkpoint=self.checkpoint, **known))
+            results = await asyncio.gather(*jobs)
+
+            completed += 1
+            if self._budget_exhausted():
+                # Algún paginador pudo cortarse a mitad: el journal conserva sus páginas
+                # y el post se vuelve a pedir en la próxima ejecución
+                self.skipped.add(post['id'])
+                return post
+
+            if extract_comments:
+                post['comments_detailed'] = results.pop(0)
+            if extract_likes:
+                post['likes_detailed'] = results.pop(0)
+            if self.checkpoint:
+                self.checkpoint.record_post(post)
+
+            self.log(f"[+] Details {completed}/{total} - ID: {post['id']} - "
+                     f"Comments: {len(post.get('comments_detailed', []))} - "
+                     f"Likes: {len(post.get('likes_detailed', []))}")
+            if self.on_post_done:
+                self.on_post_done(post)
+            return post
+
+        try:
+            await asyncio.gather(*(process_post(post) for post in posts))
+        finally:
+            executor.shutdown(wait=True)
+
+        if self.skipped:
+            self.log(f"[!] Request budget exhausted, details of {len(self.skipped)} posts were skipped")
+        return posts
+
+    def run(self, posts, **options):
+        """Punto de entrada síncrono (para llamarlo desde un hilo de trabajo)"""
+        return asyncio.run(self.fetch_details(posts, **options))
@@ -0,0 +1,58 @@
+"""
+Escritura atómica de archivos: un corte a mitad de guardado nunca deja el dataset truncado
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+# os.umask solo se puede leer cambiándolo: se hace una vez al importar, antes de que haya
+# otros hilos (el executor, el flusher o Tk) creando archivos
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_write(filename, mode='w', encoding='utf-8'):
+    """Abre un temporal junto a `filename`; al salir sin errores hace fsync y lo renombra encima.
+
+    Si algo falla (excepción, kill, corte de luz) el archivo original queda intacto.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(filename) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        _copy_mode(filename, tmp)
+        os.replace(tmp, filename)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+def _copy_mode(filename, tmp):
+    # mkstemp crea el archivo con permisos 0600: conservar los del original o los del umask
+    try:
+        mode = os.stat(filename).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(tmp, mode)
+
+
+def _fsync_directory(directory):
+    # El rename solo es duradero cuando el directorio llega a disco (no disponible en Windows)
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
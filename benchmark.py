@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de rendimiento del scraper
+Uso: python benchmark.py fetch [--posts 40] [--latency 0.05]
+     python benchmark.py pool [--accounts 1 2 4] [--rate 10]
+     python benchmark.py merge [--dataset instagram_cliniqmedellin.json] [--sizes 1000 10000 100000]
+     python benchmark.py snapshot [--datasets instagram_*.json]
+     python benchmark.py records [--datasets instagram_*.json] [--copies 5]
+     python benchmark.py analytics [--dataset instagram_cliniqmedellin.json] [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import json
+import glob
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from async_fetcher import AsyncDetailFetcher, RequestBudget
+from data_manager import IncrementalDataManager
+from engagement_analytics import PostMetrics, analyze
+from instagram_api import InstagramAPI
+from rate_limiter import AdaptiveRateLimiter
+from records import posts_from_dicts
+from session_pool import SessionPool
+from snapshot import CODEC_NONE, SnapshotStorage
+from storage import JsonStorage
+
+
+class MockInstagramHandler(BaseHTTPRequestHandler):
+    """Endpoint local que imita las páginas de comentarios y likers con latencia fija"""
+
+    latency = 0.05
+    pages = 3
+    page_size = 10
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        path, _, query = self.path.partition('?')
+        params = dict(part.split('=', 1) for part in query.split('&') if '=' in part)
+        page = int(params.get('max_id', 0))
+        next_max_id = str(page + 1) if page + 1 < self.pages else None
+
+        if path.endswith('/likers/'):
+            body = {'users': [
+                {'pk': f'{page}{i}', 'username': f'user_{page}_{i}'} for i in range(self.page_size)
+            ]}
+        else:
+            body = {'comments': [
+                {'pk': f'{page}{i}', 'text': 'mock', 'user': {'pk': i}} for i in range(self.page_size)
+            ]}
+        body['next_max_id'] = next_max_id
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_fetch(args):
+    """Mide el tiempo de extracción de detalles según el nivel de concurrencia"""
+    MockInstagramHandler.latency = args.latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockInstagramHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    baseline = None
+    try:
+        for concurrency in args.concurrency:
+            api = InstagramAPI()
+            api.base_url = f'http://127.0.0.1:{server.server_port}'
+            api.logged_in = True
+            api.rate_limiter = AdaptiveRateLimiter(rate=1000, max_rate=1000, burst=concurrency)
+            api.request_budget = RequestBudget()
+
+            posts = [{'id': str(i)} for i in range(args.posts)]
+            start = time.perf_counter()
+            AsyncDetailFetcher(api, concurrency).run(posts, max_comments=100, max_likes=100)
+            elapsed = time.perf_counter() - start
+
+            baseline = baseline or elapsed
+            print(f"concurrency={concurrency:<3} requests={api.request_budget.used:<5} "
+                  f"time={elapsed:6.2f}s speedup={baseline / elapsed:5.1f}x")
+    finally:
+        server.shutdown()
+
+
+def bench_pool(args):
+    """Mide el throughput con varias cuentas, cada una limitada a --rate requests/segundo"""
+    MockInstagramHandler.latency = args.latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockInstagramHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        for accounts in args.accounts:
+            pool = SessionPool(InstagramAPI)
+            for i in range(accounts):
+                api = InstagramAPI()
+                api.base_url = f'http://127.0.0.1:{server.server_port}'
+                api.logged_in = True
+                api.rate_limiter = AdaptiveRateLimiter(rate=args.rate, max_rate=args.rate)
+                pool.add_api(f'account_{i}', api)
+            pool.request_budget = RequestBudget()
+
+            posts = [{'id': str(i)} for i in range(args.posts)]
+            start = time.perf_counter()
+            AsyncDetailFetcher(pool, 4 * accounts).run(posts, max_comments=100, max_likes=100)
+            elapsed = time.perf_counter() - start
+
+            used = pool.request_budget.used
+            print(f"accounts={accounts:<3} requests={used:<5} time={elapsed:6.2f}s "
+                  f"throughput={used / elapsed:6.1f} req/s")
+    finally:
+        server.shutdown()
+
+
+class LinearScanDataManager(IncrementalDataManager):
+    """Implementación anterior sin índices: recorre la lista de posts en cada consulta"""
+
+    def get_existing_comment_ids(self, post_id):
+        for post in self.existing_data.get('posts', []):
+            if post['id'] == post_id:
+                return {comment['id'] for comment in post.get('comments_detailed', []) if 'id' in comment}
+        return set()
+
+    def get_existing_like_usernames(self, post_id):
+        for post in self.existing_data.get('posts', []):
+            if post['id'] == post_id:
+                return {like['username'] for like in post.get('likes_detailed', []) if 'username' in like}
+        return set()
+
+    def merge_posts_data(self, new_posts):
+        existing_posts = {post['id']: post for post in self.existing_data.get('posts', [])}
+        merged_posts = []
+        for new_post in new_posts:
+            if new_post['id'] in existing_posts:
+                merged_posts.append(self.merge_single_post(existing_posts[new_post['id']], new_post))
+            else:
+                merged_posts.append(new_post)
+        for existing_id, existing_post in existing_posts.items():
+            if not any(post['id'] == existing_id for post in new_posts):
+                merged_posts.append(existing_post)
+        return merged_posts
+
+
+def scale_posts(posts, size):
+    """Replica los posts del dataset hasta `size` con IDs únicos (comentarios y likes compartidos)"""
+    scaled = []
+    for i in range(size):
+        post = dict(posts[i % len(posts)])
+        post['id'] = f"{post['id']}_{i}"
+        post['code'] = f"{post.get('code')}_{i}"
+        scaled.append(post)
+    return scaled
+
+
+def bench_merge(args):
+    """Compara consultas y merge del gestor incremental indexado contra el recorrido lineal"""
+    with open(args.dataset, 'r', encoding='utf-8') as f:
+        source_posts = json.load(f)['posts']
+
+    for size in args.sizes:
+        stored = scale_posts(source_posts, size)
+        # Lote típico de una actualización: posts ya guardados con contadores nuevos + posts nuevos
+        batch = [dict(post, like_count=post.get('like_count', 0) + 1) for post in stored[:args.batch // 2]]
+        batch += [dict(post, id=f"new_{post['id']}") for post in stored[:args.batch - len(batch)]]
+
+        timings = {}
+        for name, cls in (('linear', LinearScanDataManager), ('indexed', IncrementalDataManager)):
+            manager = cls(os.devnull)
+            manager.existing_data = {'posts': list(stored)}
+
+            # Equivale a load_existing_data sin el parseo del JSON
+            start = time.perf_counter()
+            if name == 'indexed':
+                manager._build_indexes()
+            load = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for post in batch:
+                manager.get_existing_comment_ids(post['id'])
+                manager.get_existing_like_usernames(post['id'])
+            lookups = time.perf_counter() - start
+
+            start = time.perf_counter()
+            merged = manager.merge_posts_data(batch)
+            merge = time.perf_counter() - start
+
+            timings[name] = load + lookups + merge
+            print(f"posts={size:<7} {name:<8} index={load:7.3f}s lookups={lookups:7.3f}s merge={merge:7.3f}s "
+                  f"total={timings[name]:7.3f}s merged={len(merged)}")
+        print(f"posts={size:<7} speedup={timings['linear'] / timings['indexed']:7.1f}x")
+
+
+def bench_snapshot(args):
+    """Compara carga, guardado y tamaño del JSON indentado contra el snapshot binario"""
+    datasets = args.datasets or sorted(glob.glob('instagram_*.json'))
+    with tempfile.TemporaryDirectory() as tmp:
+        for dataset in datasets:
+            data = JsonStorage(dataset).load()
+            name = os.path.splitext(os.path.basename(dataset))[0]
+            backends = (
+                ('json', JsonStorage(os.path.join(tmp, name + '.json'))),
+                ('snapshot', SnapshotStorage(os.path.join(tmp, name + '.igsnap'))),
+                ('snapshot-raw', SnapshotStorage(os.path.join(tmp, name + '.raw.igsnap'), codec=CODEC_NONE)),
+            )
+            baseline = None
+            expected = None
+            for label, storage in backends:
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    storage.save(data)
+                save = (time.perf_counter() - start) / args.repeat
+
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    loaded = storage.load()
+                load = (time.perf_counter() - start) / args.repeat
+                # Con NORMALIZE_USERS cada backend guarda una foto por usuario: se compara entre backends
+                expected = expected or loaded
+                assert loaded == expected
+
+                size = os.path.getsize(storage.filename)
+                baseline = baseline or (load, size)
+                print(f"{name:<32} {label:<13} load={load * 1000:7.1f}ms save={save * 1000:7.1f}ms "
+                      f"size={size / 1024:7.0f}KB ({baseline[1] / size:4.1f}x smaller, "
+                      f"{baseline[0] / load:4.1f}x faster load)")
+
+
+def bench_records(args):
+    """Memoria de varios perfiles cargados a la vez: dicts contra registros con __slots__"""
+    datasets = args.datasets or sorted(glob.glob('instagram_*.json'))
+    results = {}
+    for label, convert in (('dicts', None), ('records', posts_from_dicts)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        loaded = []
+        for _ in range(args.copies):
+            for dataset in datasets:
+                data = JsonStorage(dataset).load()
+                if convert:
+                    data['posts'] = convert(data['posts'])
+                loaded.append(data)
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        manager = IncrementalDataManager(os.devnull)
+        manager.existing_data = loaded[0]
+        start = time.perf_counter()
+        manager.merge_posts_data([post.copy() for post in loaded[-1]['posts']])
+        merge = time.perf_counter() - start
+
+        results[label] = current
+        print(f"{label:<8} profiles={len(loaded):3d} held={current / 1024 / 1024:7.1f}MB "
+              f"peak={peak / 1024 / 1024:7.1f}MB load={elapsed:6.2f}s merge={merge * 1000:6.1f}ms")
+        del loaded, manager
+    print(f"[+] Records use {100 * (1 - results['records'] / results['dicts']):.1f}% less memory")
+
+
+def bench_analytics(args):
+    """Agregados de engagement vectorizados sobre un dataset escalado"""
+    with open(args.dataset, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    followers = data.get('profile', {}).get('followers_count')
+
+    for size in args.sizes:
+        posts = scale_posts(data['posts'], size)
+        # Fechas repartidas para que los agregados por mes, día y hora tengan grupos distintos
+        for i, post in enumerate(posts):
+            post['taken_at'] = (post.get('taken_at') or 0) - i * 3607
+
+        start = time.perf_counter()
+        metrics = PostMetrics.from_posts(posts)
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = analyze(metrics, followers)
+        aggregate = time.perf_counter() - start
+        print(f"posts={size:<7} columns={load:7.3f}s aggregates={aggregate:7.3f}s total={load + aggregate:7.3f}s "
+              f"months={len(stats['by_month'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del Instagram Scraper")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fetch = subparsers.add_parser('fetch', help="Extracción concurrente contra un endpoint local")
+    fetch.add_argument('--posts', type=int, default=40)
+    fetch.add_argument('--latency', type=float, default=0.05)
+    fetch.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    fetch.set_defaults(func=bench_fetch)
+
+    pool = subparsers.add_parser('pool', help="Throughput del pool de cuentas contra un endpoint local")
+    pool.add_argument('--posts', type=int, default=20)
+    pool.add_argument('--latency', type=float, default=0.02)
+    pool.add_argument('--rate', type=float, default=10.0)
+    pool.add_argument('--accounts', type=int, nargs='+', default=[1, 2, 4])
+    pool.set_defaults(func=bench_pool)
+
+    merge = subparsers.add_parser('merge', help="Consultas y merge incremental sobre un dataset escalado")
+    merge.add_argument('--dataset', default='instagram_cliniqmedellin.json')
+    merge.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    merge.add_argument('--batch', type=int, default=1000, help="Posts del lote a combinar")
+    merge.set_defaults(func=bench_merge)
+
+    snapshot = subparsers.add_parser('snapshot', help="JSON indentado contra snapshot binario")
+    snapshot.add_argument('--datasets', nargs='+')
+    snapshot.add_argument('--repeat', type=int, default=5)
+    snapshot.set_defaults(func=bench_snapshot)
+
+    records = subparsers.add_parser('records', help="Memoria de perfiles cargados: dicts contra registros")
+    records.add_argument('--datasets', nargs='+')
+    records.add_argument('--copies', type=int, default=5, help="Veces que se carga cada dataset")
+    records.set_defaults(func=bench_records)
+
+    analytics = subparsers.add_parser('analytics', help="Agregados de engagement sobre un dataset escalado")
+    analytics.add_argument('--dataset', default='instagram_cliniqmedellin.json')
+    analytics.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    analytics.set_defaults(func=bench_analytics)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Checkpoints reanudables: journal JSON Lines con cursores de paginación y posts completados
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from records import json_default
+
+
+class ScrapeCheckpoint:
+    """Journal append-only de una ejecución de scraping.
+
+    Cada línea es un evento:
+      - header: parámetros de la ejecución (si cambian, el journal se descarta)
+      - page:   items de una página y el next_max_id de feed, comentarios o likes
+      - post:   un post con todos sus detalles ya extraídos
+    Al reiniciar se reproduce el journal y cada paginador continúa desde su cursor.
+    """
+
+    def __init__(self, filename, params=None):
+        self.filename = filename
+        self.params = params or {}
+        self.pages = {}
+        self.completed_posts = {}
+        self._lock = threading.Lock()
+        self._file = None
+        self._resumed = False
+
+    def load(self):
+        """Reproduce el journal existente. Devuelve True si hay progreso que reanudar"""
+        if not os.path.exists(self.filename):
+            return False
+
+        pages, completed = {}, {}
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última línea truncada por un corte a mitad de escritura
+                    break
+                kind = event.get('type')
+                if kind == 'header':
+                    if event.get('params') != self.params:
+                        return False
+                elif kind == 'page':
+                    state = pages.setdefault((event['endpoint'], event['key']), {'items': [], 'cursor': None})
+                    state['items'].extend(event['items'])
+                    state['cursor'] = event['cursor']
+                elif kind == 'post':
+                    completed[event['post']['id']] = event['post']
+
+        self.pages, self.completed_posts = pages, completed
+        self._resumed = bool(pages or completed)
+        return self._resumed
+
+    def _append(self, event):
+        line = json.dumps(event, ensure_ascii=False, default=json_default)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.filename, 'a' if self._resumed else 'w', encoding='utf-8')
+                if not self._resumed:
+                    header = {'type': 'header', 'params': self.params, 'created_at': datetime.now().isoformat()}
+                    self._file.write(json.dumps(header) + '\n')
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def resume_state(self, endpoint, key):
+        """Items ya obtenidos y cursor pendiente de un paginador, o None si no hay progreso"""
+        state = self.pages.get((endpoint, str(key)))
+        if state is None:
+            return None
+        return {'items': list(state['items']), 'cursor': state['cursor']}
+
+    def record_page(self, endpoint, key, items, cursor):
+        """Registra una página completada y el cursor para pedir la siguiente"""
+        self._append({'type': 'page', 'endpoint': endpoint, 'key': str(key), 'items': items, 'cursor': cursor})
+
+    def record_post(self, post):
+        """Registra un post cuyos detalles ya están completos"""
+        self.completed_posts[post['id']] = post
+        self._append({'type': 'post', 'post': post})
+
+    def get_completed_post(self, post_id):
+        return self.completed_posts.get(post_id)
+
+    def close(self):
+        """Cierra el journal y lo conserva para reanudar en la próxima ejecución"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        """Elimina el journal tras una ejecución terminada con éxito"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.filename):
+                os.remove(self.filename)
+        self.pages = {}
+        self.completed_posts = {}
+        self._resumed = False
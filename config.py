@@ -2,9 +2,33 @@
 
 class Config:
     # Configuración de requests
-    REQUEST_DELAY = 5  # Segundos entre requests (recomendado: 2-5)
+    RATE_LIMIT_INITIAL = 1 / 3   # Requests/segundo al iniciar (equivale a 3s entre requests)
+    RATE_LIMIT_MIN = 0.1         # Tasa mínima tras backoff por 429/5xx
+    RATE_LIMIT_MAX = 2.0         # Tasa máxima mientras las respuestas sean sanas
     MAX_RETRIES = 3    # Número máximo de reintentos
     TIMEOUT = 30       # Timeout en segundos
+    RETRY_POLICIES = {           # Ajustes por endpoint sobre MAX_RETRIES/TIMEOUT
+        'feed': {'max_retries': 5},
+        'replies': {'max_retries': 1, 'timeout': 15},
+    }
+    MAX_CONCURRENT_REQUESTS = 4  # Requests de detalle en paralelo (comentarios, likes, respuestas)
+    REQUEST_BUDGET = None        # Máximo de requests por ejecución (None = sin límite)
+    
+    # Pool de cuentas (opcional): JSON con [{"username", "password", "cookie_file"}]
+    ACCOUNTS_FILE = "accounts.json"
+    ACCOUNT_COOLDOWN = 300       # Segundos de pausa para una cuenta que recibe HTTP 429
+    
+    # Caché de respuestas HTTP (opcional)
+    RESPONSE_CACHE = False
+    RESPONSE_CACHE_FILE = "instagram_cache.sqlite3"
+    RESPONSE_CACHE_MAX_MB = 200
+    RESPONSE_CACHE_TTLS = {      # Segundos de validez por endpoint (0 = no cachear)
+        'profile': 6 * 3600,
+        'feed': 3600,
+        'comments': 6 * 3600,
+        'replies': 24 * 3600,
+        'likers': 6 * 3600,
+    }
     
     # Configuración de la interfaz
     WINDOW_SIZE = "1000x800"
@@ -30,7 +54,15 @@ class Config:
     
     # Configuración de modo incremental
     INCREMENTAL_MODE = True      # Activar modo incremental por defecto
-    BACKUP_PREVIOUS_DATA = True  # Crear backup antes de actualizar
+    BACKUP_PREVIOUS_DATA = True  # Registrar cada versión en instagram_{username}.history.jsonl (deltas)
+    INCREMENTAL_EARLY_STOP = True       # Detener el feed al encontrar posts ya guardados
+    INCREMENTAL_STOP_AFTER_KNOWN = 6    # Posts conocidos seguidos antes de detenerse
+    INCREMENTAL_REFRESH_WINDOW = 12     # Posts existentes recientes cuyos contadores se refrescan (0 = ninguno)
+    REFRESH_EXISTING_POSTS = True       # Volver a extraer detalles de posts existentes con contadores nuevos
+    REFRESH_MAX_POSTS = 20              # Máximo de posts existentes a refrescar por ejecución
+    REFRESH_COMMENT_WEIGHT = 3.0        # Peso de cada comentario nuevo en la prioridad
+    REFRESH_LIKE_WEIGHT = 1.0           # Peso de cada like nuevo en la prioridad
+    REFRESH_HALF_LIFE_DAYS = 30         # Cada 30 días de antigüedad la prioridad se reduce a la mitad
     
     # User Agent (actualizable)
     USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
@@ -38,6 +70,18 @@ class Config:
     # Configuración de archivos
     SAVE_JSON_DEFAULT = True
     SAVE_MEDIA_DEFAULT = True
+    STORAGE_BACKEND = "json"     # "json" (un archivo por perfil), "snapshot" (binario comprimido) o "sqlite" (base normalizada)
+    SQLITE_FILE = "instagram_data.sqlite3"
+    NORMALIZE_USERS = True       # Guardar cada usuario una vez (tabla "users") y referenciarlo por id
+                                 # Sin pérdida: los likes/comentarios con valores distintos (p. ej. la foto
+                                 # de perfil firmada de esa ejecución) los guardan junto a la referencia
+    STREAM_NDJSON = True         # Volcar cada post a instagram_{username}.ndjson en cuanto se completa
+    PERIODIC_FLUSH = True        # Guardar el dataset combinado durante las ejecuciones incrementales
+    FLUSH_EVERY_POSTS = 25       # ...cada N posts con detalles completos
+    FLUSH_EVERY_SECONDS = 120    # ...o cada T segundos
+    MEDIA_IMAGE_POLICY = "best"  # "best" (solo la mayor resolución), "all" o lista de anchos, p. ej. [1080, 320]
+    MEDIA_VIDEO_POLICY = "best"  # "none", "best" o "all"
+    MEDIA_SPLIT_URLS = True      # Guardar las URLs de medios como ruta base + parámetros
     OUTPUT_FORMAT = "instagram_{username}_{timestamp}.json"
     
     # Configuración de logs
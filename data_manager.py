@@ -0,0 +1,256 @@
+"""
+Gestión incremental de los datasets instagram_{username}.json
+"""
+
+from datetime import datetime
+
+from dataset_summary import is_current, summarize, update_summary
+from records import posts_from_dicts
+from storage import JsonStorage
+
+
+class IncrementalDataManager:
+    """Gestiona la carga y actualización incremental de datos"""
+    
+    def __init__(self, filename, storage=None, history=None):
+        self.filename = filename
+        self.storage = storage or JsonStorage(filename)
+        self.history = history
+        self.existing_data = None
+        self.previous_data = None
+        self.dirty_post_ids = None
+        self.replaced_posts = None
+        self.changed_posts = None
+        self.summary = None
+        self._indexed_data = None
+        self.posts_by_id = {}
+        self.posts_by_code = {}
+        self.comment_ids = {}
+        self.like_usernames = {}
+        self.latest_comment_at = {}
+        self.latest_taken_at = None
+        
+    def load_existing_data(self):
+        """Carga datos existentes desde el backend de almacenamiento"""
+        try:
+            self.existing_data = self.storage.load()
+        except Exception as e:
+            print(f"Error loading existing data: {e}")
+            return False
+        if self.existing_data is None:
+            return False
+        # Registros con __slots__ en vez de dicts: varios perfiles grandes caben en menos memoria
+        self.existing_data['posts'] = posts_from_dicts(self.existing_data.get('posts', []))
+        self._build_indexes()
+        return True
+    
+    def _build_indexes(self):
+        """Construye los índices por id/code y los conjuntos de comentarios y likers de cada post"""
+        self._indexed_data = self.existing_data
+        self.posts_by_id = {}
+        self.posts_by_code = {}
+        self.comment_ids = {}
+        self.like_usernames = {}
+        self.latest_comment_at = {}
+        self.latest_taken_at = None
+        for post in (self.existing_data or {}).get('posts', []):
+            self._index_post(post)
+    
+    def _ensure_indexes(self):
+        # existing_data también puede asignarse directamente sin pasar por load_existing_data
+        if self._indexed_data is not self.existing_data:
+            self._build_indexes()
+    
+    def _index_post(self, post):
+        post_id = post['id']
+        self.posts_by_id[post_id] = post
+        if post.get('code'):
+            self.posts_by_code[post['code']] = post
+        if post.get('taken_at') and (self.latest_taken_at is None or post['taken_at'] > self.latest_taken_at):
+            self.latest_taken_at = post['taken_at']
+        
+        comments = post.get('comments_detailed', [])
+        self.comment_ids[post_id] = {comment['id'] for comment in comments if 'id' in comment}
+        timestamps = [c['created_at'] for c in comments if c.get('created_at')]
+        self.latest_comment_at[post_id] = max(timestamps) if timestamps else None
+        
+        likes = post.get('likes_detailed', [])
+        self.like_usernames[post_id] = {like['username'] for like in likes if 'username' in like}
+    
+    def get_post(self, post_id):
+        """Obtiene un post guardado por su ID"""
+        self._ensure_indexes()
+        return self.posts_by_id.get(post_id)
+    
+    def get_post_by_code(self, code):
+        """Obtiene un post guardado por su shortcode"""
+        self._ensure_indexes()
+        return self.posts_by_code.get(code)
+    
+    def get_existing_post_ids(self):
+        """Obtiene los IDs de posts existentes"""
+        self._ensure_indexes()
+        return set(self.posts_by_id)
+    
+    def get_latest_taken_at(self):
+        """Obtiene el taken_at del post más reciente ya guardado (marca de agua)"""
+        self._ensure_indexes()
+        return self.latest_taken_at
+    
+    def get_existing_comment_ids(self, post_id):
+        """Obtiene los IDs de comentarios existentes para un post específico (no modificar)"""
+        self._ensure_indexes()
+        return self.comment_ids.get(post_id, set())
+    
+    def get_latest_comment_created_at(self, post_id):
+        """Obtiene el created_at del comentario más reciente guardado para un post"""
+        self._ensure_indexes()
+        return self.latest_comment_at.get(post_id)
+    
+    def get_existing_like_usernames(self, post_id):
+        """Obtiene los usernames que ya dieron like a un post (no modificar)"""
+        self._ensure_indexes()
+        return self.like_usernames.get(post_id, set())
+    
+    def merge_posts_data(self, new_posts):
+        """Combina posts nuevos con existentes de forma inteligente"""
+        if not self.existing_data:
+            return new_posts
+        
+        self._ensure_indexes()
+        # Versión sobre la que se combina (los posts existentes no se modifican, se copian)
+        self.previous_data = dict(self.existing_data, posts=list(self.existing_data.get('posts', [])))
+        merged_posts = self.merged_view(new_posts)
+        
+        # Solo los posts recibidos pueden haber cambiado: son los únicos que se reescriben
+        self.dirty_post_ids = {post['id'] for post in new_posts}
+        # Delta para el resumen: versiones anteriores de esos posts y las combinadas
+        # (merged_view pone primero las de los posts recibidos)
+        self.replaced_posts = [self.posts_by_id[post_id] for post_id in self.dirty_post_ids
+                               if post_id in self.posts_by_id]
+        self.changed_posts = merged_posts[:len(new_posts)]
+        
+        # Los índices siguen al dataset combinado
+        for post in merged_posts:
+            if self.posts_by_id.get(post['id']) is not post:
+                self._index_post(post)
+        self.existing_data['posts'] = merged_posts
+        
+        return merged_posts
+    
+    def merged_view(self, new_posts):
+        """Posts combinados sin modificar el estado del gestor (también sirve para guardados parciales)"""
+        self._ensure_indexes()
+        merged_posts = []
+        new_ids = set()
+        
+        for new_post in new_posts:
+            post_id = new_post['id']
+            new_ids.add(post_id)
+            
+            existing_post = self.posts_by_id.get(post_id)
+            if existing_post is not None:
+                # Post existe, hacer merge inteligente
+                merged_posts.append(self.merge_single_post(existing_post, new_post))
+            else:
+                # Post nuevo, agregar directamente
+                merged_posts.append(new_post)
+        
+        # Agregar posts existentes que no estaban en los nuevos
+        for existing_id, existing_post in list(self.posts_by_id.items()):
+            if existing_id not in new_ids:
+                merged_posts.append(existing_post)
+        
+        return merged_posts
+    
+    def merge_single_post(self, existing_post, new_post):
+        """Combina un post existente con datos nuevos"""
+        merged = existing_post.copy()
+        
+        # Actualizar campos básicos (likes, comentarios pueden haber cambiado)
+        # Siempre usar los valores más recientes para contadores
+        merged.update({
+            'like_count': new_post.get('like_count', existing_post.get('like_count', 0)),
+            'comment_count': new_post.get('comment_count', existing_post.get('comment_count', 0))
+        })
+        
+        # Merge comentarios
+        if 'comments_detailed' in new_post:
+            merged['comments_detailed'] = self.merge_comments(
+                existing_post.get('comments_detailed', []),
+                new_post.get('comments_detailed', []),
+                self.comment_ids.get(existing_post['id'])
+            )
+        
+        # Merge likes
+        if 'likes_detailed' in new_post:
+            merged['likes_detailed'] = self.merge_likes(
+                existing_post.get('likes_detailed', []),
+                new_post.get('likes_detailed', []),
+                self.like_usernames.get(existing_post['id'])
+            )
+        
+        # Agregar timestamp de última actualización
+        merged['last_updated'] = datetime.now().isoformat()
+        
+        return merged
+    
+    def merge_comments(self, existing_comments, new_comments, existing_ids=None):
+        """Combina comentarios existentes con nuevos"""
+        if existing_ids is None:
+            existing_ids = {comment.get('id') for comment in existing_comments if 'id' in comment}
+        merged_comments = existing_comments.copy()
+        
+        for new_comment in new_comments:
+            if new_comment.get('id') not in existing_ids:
+                merged_comments.append(new_comment)
+        
+        return merged_comments
+    
+    def merge_likes(self, existing_likes, new_likes, existing_usernames=None):
+        """Combina likes existentes con nuevos"""
+        if existing_usernames is None:
+            existing_usernames = {like.get('username') for like in existing_likes if 'username' in like}
+        merged_likes = existing_likes.copy()
+        
+        for new_like in new_likes:
+            if new_like.get('username') not in existing_usernames:
+                merged_likes.append(new_like)
+        
+        return merged_likes
+    
+    def build_metadata(self, total_posts):
+        """Metadatos de la nueva versión del dataset"""
+        return {
+            'last_full_scrape': datetime.now().isoformat(),
+            'total_posts': total_posts,
+            'incremental_updates': self.existing_data.get('metadata', {}).get('incremental_updates', 0) + 1 if self.existing_data else 1
+        }
+    
+    def build_summary(self, merged_posts):
+        """Resumen agregado del dataset combinado (a partir del delta si el anterior tiene resumen)"""
+        previous = ((self.existing_data or {}).get('metadata') or {}).get('summary')
+        if self.replaced_posts is None or not is_current(previous):
+            return summarize(merged_posts)
+        return update_summary(previous, self.replaced_posts, self.changed_posts, merged_posts)
+    
+    def save_merged_data(self, profile_data, merged_posts):
+        """Guarda los datos combinados"""
+        metadata = self.build_metadata(len(merged_posts))
+        metadata['summary'] = self.summary = self.build_summary(merged_posts)
+        # metadata antes que los posts: el resumen se lee sin recorrerlos
+        result = {
+            'profile': profile_data,
+            'metadata': metadata,
+            'posts': merged_posts
+        }
+        
+        self.storage.save(result, self.dirty_post_ids)
+        if self.history is not None:
+            # Solo el delta respecto a la versión cargada: no hace falta copiar el archivo entero
+            self.history.append(result, self.previous_data)
+        
+        if self.existing_data is not None:
+            self.existing_data['metadata'] = metadata
+        self.replaced_posts = self.changed_posts = None
+        return result
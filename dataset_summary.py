@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Resumen agregado de un dataset guardado en metadata['summary']
+
+Totales, conteos por tipo de contenido y posts con más y menos likes. Se actualiza en
+cada guardado incremental a partir del delta del merge, y va antes de los posts en el
+archivo: los consumidores que solo necesitan el resumen no recorren los posts.
+
+Uso:
+    python dataset_summary.py instagram_cliniqmedellin.json
+    python dataset_summary.py instagram_*.json --compute   # calcula el resumen si falta
+"""
+
+import argparse
+import copy
+import glob
+
+from media import media_label
+from streaming_loader import iter_posts, load_summary
+
+SUMMARY_VERSION = 2
+# Campos que necesita el resumen (los detalles solo se cuentan)
+SUMMARY_FIELDS = ('id', 'code', 'like_count', 'comment_count', 'taken_at', 'media_type')
+COUNTED_FIELDS = ('comments_detailed', 'likes_detailed')
+
+
+def real_likes(like_count, likers):
+    """like_count, o el número de likes extraídos si la API devolvió un valor bajo (<= 3)"""
+    if like_count <= 3 and likers > 3:
+        return likers
+    return like_count
+
+
+def _detail_count(post, field):
+    # Post completo (lista) o proyectado con count=... ('<campo>_count')
+    counted = post.get(f'{field}_count')
+    if counted is not None:
+        return counted
+    return len(post.get(field) or ())
+
+
+def empty_summary():
+    return {
+        'version': SUMMARY_VERSION,
+        'posts': 0,
+        'dated_posts': 0,
+        'total_likes': 0,
+        'total_real_likes': 0,
+        'total_comments': 0,
+        'extracted_comments': 0,
+        'extracted_likers': 0,
+        'by_media_type': {},
+        'max_likes': None,
+        'min_likes': None,
+    }
+
+
+def _add(summary, post, sign):
+    """Suma (sign=1) o resta (sign=-1) la contribución de un post a los totales"""
+    likes = post.get('like_count') or 0
+    comments = post.get('comment_count') or 0
+    likers = _detail_count(post, 'likes_detailed')
+    real = real_likes(likes, likers)
+
+    summary['posts'] += sign
+    if post.get('id') and post.get('taken_at'):
+        summary['dated_posts'] += sign
+    summary['total_likes'] += sign * likes
+    summary['total_real_likes'] += sign * real
+    summary['total_comments'] += sign * comments
+    summary['extracted_comments'] += sign * _detail_count(post, 'comments_detailed')
+    summary['extracted_likers'] += sign * likers
+
+    # Claves de texto: el resumen se guarda en JSON
+    key = str(post.get('media_type') or 0)
+    by_type = summary['by_media_type'].setdefault(key, {'count': 0, 'likes': 0, 'real_likes': 0, 'comments': 0})
+    by_type['count'] += sign
+    by_type['likes'] += sign * likes
+    by_type['real_likes'] += sign * real
+    by_type['comments'] += sign * comments
+    if by_type['count'] <= 0:
+        del summary['by_media_type'][key]
+
+
+def _ref(post):
+    return {'id': post.get('id'), 'code': post.get('code', 'N/A'), 'like_count': post.get('like_count') or 0,
+            'taken_at': post.get('taken_at') or 0}
+
+
+def tie_rank(taken_at, post_id):
+    """Desempate de los extremos: el post más antiguo y luego el menor id (no depende del orden)"""
+    return (taken_at or 0, post_id or '')
+
+
+def _better(key, ref, current):
+    if ref['like_count'] != current['like_count']:
+        more = ref['like_count'] > current['like_count']
+        return more if key == 'max_likes' else not more
+    return tie_rank(ref['taken_at'], ref['id']) < tie_rank(current['taken_at'], current['id'])
+
+
+def _extreme(posts, key):
+    """Post con más (o menos) likes"""
+    best = None
+    for post in posts:
+        ref = _ref(post)
+        if best is None or _better(key, ref, best):
+            best = ref
+    return best
+
+
+def summarize(posts):
+    """Resumen completo de una lista (o iterable) de posts"""
+    summary = empty_summary()
+    posts = list(posts)
+    for post in posts:
+        _add(summary, post, 1)
+    summary['max_likes'] = _extreme(posts, 'max_likes')
+    summary['min_likes'] = _extreme(posts, 'min_likes')
+    return summary
+
+
+def update_summary(summary, old_posts, new_posts, posts):
+    """Resumen tras reemplazar old_posts por new_posts (el delta de un merge).
+
+    posts es el dataset resultante: solo se recorre si cambió el post que tenía el
+    máximo o el mínimo y dejó de serlo. Los empates se resuelven con tie_rank, así que
+    el resultado es el mismo que el de summarize(posts).
+    """
+    summary = copy.deepcopy(summary)
+    for post in old_posts:
+        _add(summary, post, -1)
+    for post in new_posts:
+        _add(summary, post, 1)
+
+    changed = {post.get('id'): post for post in new_posts}
+    removed = {post.get('id') for post in old_posts} - set(changed)
+    for key in ('max_likes', 'min_likes'):
+        current = summary[key]
+        if current is not None and current['id'] in removed:
+            current = None
+            stale = True
+        else:
+            stale = False
+        if current is not None and current['id'] in changed:
+            updated = _ref(changed[current['id']])
+            # Si el post que era el extremo empeora, otro post puede haberlo superado
+            stale = _better(key, current, updated)
+            current = updated
+        if stale:
+            summary[key] = _extreme(posts, key)
+            continue
+        for post in new_posts:
+            ref = _ref(post)
+            if current is None or _better(key, ref, current):
+                current = ref
+        summary[key] = current
+    return summary
+
+
+def is_current(summary):
+    return isinstance(summary, dict) and summary.get('version') == SUMMARY_VERSION
+
+
+def compute_file_summary(filename):
+    """Resumen calculado desde los posts del archivo, decodificando solo los campos necesarios"""
+    return summarize(iter_posts(filename, fields=SUMMARY_FIELDS, count=COUNTED_FIELDS))
+
+
+def print_summary(filename, summary):
+    posts = summary['posts']
+    print(f"📊 {filename}: {posts} posts ({summary['dated_posts']} con fecha)")
+    print(f"   💯 Likes: {summary['total_likes']:,} (reales: {summary['total_real_likes']:,}), "
+          f"promedio {summary['total_likes'] / posts if posts else 0:.1f}")
+    print(f"   💬 Comentarios: {summary['total_comments']:,}, extraídos {summary['extracted_comments']:,}; "
+          f"likers extraídos {summary['extracted_likers']:,}")
+    for key, label in (('max_likes', '🔝 Más likes'), ('min_likes', '🔻 Menos likes')):
+        post = summary[key]
+        if post:
+            print(f"   {label}: {post['like_count']} (Código: {post['code']})")
+    for media_type, stats in summary['by_media_type'].items():
+        print(f"   {media_label(int(media_type))}: {stats['count']} posts, "
+              f"{stats['likes'] / stats['count']:.1f} likes promedio")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Muestra el resumen agregado de los datasets sin leer los posts")
+    parser.add_argument('files', nargs='*', help="Datasets (por defecto, todos los instagram_*.json)")
+    parser.add_argument('--compute', action='store_true', help="Calcula el resumen de los datasets que no lo tienen")
+    args = parser.parse_args()
+
+    for filename in args.files or sorted(glob.glob('instagram_*.json')):
+        summary = load_summary(filename)
+        if not is_current(summary):
+            if not args.compute:
+                print(f"❌ {filename}: sin resumen (se genera en el próximo guardado incremental, o usa --compute)")
+                continue
+            summary = compute_file_summary(filename)
+        print_summary(filename, summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,25 +3,24 @@
 Script de diagnóstico para verificar los datos del JSON
 """
 
-import json
+from itertools import islice
+
+from streaming_loader import iter_posts, load_header
 
 def diagnose_json_data():
     """Diagnostica los datos del JSON para encontrar el problema"""
     
-    # Cargar datos
-    with open('instagram_cliniqmedellin.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    posts = data.get('posts', [])
+    filename = 'instagram_cliniqmedellin.json'
+    header = load_header(filename)
     
     print("🔍 DIAGNÓSTICO DE DATOS")
-    print(f"Total de posts: {len(posts)}")
+    print(f"Total de posts: {header['total_posts']}")
     print("\n" + "="*60)
     
-    # Verificar primeros 5 posts
+    # Verificar primeros 5 posts (completos, para ver su estructura)
     print("\n📊 ANÁLISIS DE LOS PRIMEROS 5 POSTS:")
     
-    for i, post in enumerate(posts[:5]):
+    for i, post in enumerate(islice(iter_posts(filename), 5)):
         print(f"\n--- POST {i+1} ---")
         print(f"ID: {post.get('id', 'N/A')}")
         print(f"Like count (directo): {post.get('like_count')}")
@@ -39,7 +38,8 @@ def diagnose_json_data():
         # Verificar estructura completa
         print(f"Campos disponibles: {list(post.keys())}")
     
-    # Estadísticas generales
+    # Estadísticas generales: solo los campos de post necesarios
+    posts = list(iter_posts(filename, fields=('like_count', 'caption')))
     print("\n" + "="*60)
     print("\n📈 ESTADÍSTICAS GENERALES:")
     
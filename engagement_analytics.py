@@ -0,0 +1,171 @@
+"""
+Métricas de engagement con NumPy: las métricas de los posts se cargan una vez en columnas
+y todos los agregados se calculan de forma vectorizada
+"""
+
+import time
+
+import numpy as np
+
+from dataset_summary import tie_rank
+from media import media_label
+from streaming_loader import iter_posts
+
+WEEKDAYS = ("Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo")
+METRIC_FIELDS = ('id', 'code', 'like_count', 'comment_count', 'taken_at', 'media_type')
+
+
+def _local_offsets(timestamps):
+    """Desfase UTC local (segundos) de cada timestamp, calculado una vez por hora distinta"""
+    if not len(timestamps):
+        return np.zeros(0, dtype=np.int64)
+    hours, inverse = np.unique(timestamps // 3600, return_inverse=True)
+    offsets = np.fromiter((time.localtime(int(hour) * 3600).tm_gmtoff for hour in hours),
+                          dtype=np.int64, count=len(hours))
+    return offsets[inverse]
+
+
+class PostMetrics:
+    """Columnas de métricas por post (mismo índice en todos los arrays, orden del dataset)"""
+
+    def __init__(self, likes, comments, taken_at, media_type, codes, ids=None):
+        self.likes = likes
+        self.comments = comments
+        self.taken_at = taken_at
+        self.media_type = media_type
+        self.codes = codes
+        self.ids = ids if ids is not None else [None] * len(codes)
+        # Hora local, como datetime.fromtimestamp en los reportes
+        self.local_time = taken_at + _local_offsets(taken_at)
+
+    @classmethod
+    def from_posts(cls, posts):
+        count = len(posts)
+
+        def column(field):
+            return np.fromiter(((post.get(field) or 0) for post in posts), dtype=np.int64, count=count)
+
+        codes = [post.get('code', 'N/A') for post in posts]
+        ids = [post.get('id') for post in posts]
+        return cls(column('like_count'), column('comment_count'), column('taken_at'), column('media_type'), codes, ids)
+
+    @classmethod
+    def from_file(cls, filename):
+        """Lee solo los campos de métricas del dataset, en streaming"""
+        return cls.from_posts(list(iter_posts(filename, fields=METRIC_FIELDS)))
+
+    def __len__(self):
+        return len(self.likes)
+
+    @property
+    def dated(self):
+        """Máscara de los posts con fecha"""
+        return self.taken_at > 0
+
+
+def _tied(metrics, likes):
+    """Índice del post con `likes` likes; en empate, el mismo que elige dataset_summary"""
+    candidates = np.flatnonzero(metrics.likes == likes)
+    return int(min(candidates, key=lambda i: tie_rank(int(metrics.taken_at[i]), metrics.ids[i])))
+
+
+def summary(metrics):
+    """Totales, promedio y posts con más y menos likes (desempate de dataset_summary.tie_rank)"""
+    if not len(metrics):
+        return None
+    top, bottom = _tied(metrics, metrics.likes.max()), _tied(metrics, metrics.likes.min())
+    return {
+        'posts': len(metrics),
+        'total_likes': int(metrics.likes.sum()),
+        'total_comments': int(metrics.comments.sum()),
+        'avg_likes': float(metrics.likes.mean()),
+        'avg_comments': float(metrics.comments.mean()),
+        'max': (int(metrics.likes[top]), metrics.codes[top]),
+        'min': (int(metrics.likes[bottom]), metrics.codes[bottom]),
+    }
+
+
+def _group(keys, likes, comments):
+    """(clave, posts, likes, comentarios) por clave, en orden de primera aparición"""
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(unique))
+    like_sums = np.bincount(inverse, weights=likes, minlength=len(unique))
+    comment_sums = np.bincount(inverse, weights=comments, minlength=len(unique))
+    return [(unique[i], int(counts[i]), int(like_sums[i]), int(comment_sums[i])) for i in np.argsort(first)]
+
+
+def by_media_type(metrics):
+    """{etiqueta: {'count', 'total_likes', 'avg_likes', 'avg_comments'}} en orden de primera aparición"""
+    result = {}
+    for media_type, count, likes, comments in _group(metrics.media_type, metrics.likes, metrics.comments):
+        result[media_label(int(media_type))] = {
+            'count': count, 'total_likes': likes, 'avg_likes': likes / count, 'avg_comments': comments / count
+        }
+    return result
+
+
+def by_month(metrics):
+    """{'YYYY-MM': {'count', 'total_likes', 'avg_likes'}} en orden cronológico (solo posts con fecha)"""
+    dated = metrics.dated
+    months = metrics.local_time[dated].astype('datetime64[s]').astype('datetime64[M]')
+    groups = _group(months, metrics.likes[dated], metrics.comments[dated])
+    return {
+        str(month): {'count': count, 'total_likes': likes, 'avg_likes': likes / count}
+        for month, count, likes, _ in sorted(groups, key=lambda group: group[0])
+    }
+
+
+def by_weekday_hour(metrics):
+    """Matrices 7x24 (lunes = 0) con número de posts y promedio de likes por día y hora local"""
+    dated = metrics.dated
+    local = metrics.local_time[dated]
+    # El 1970-01-01 fue jueves (3 con lunes = 0)
+    cells = ((local // 86400 + 3) % 7) * 24 + (local % 86400) // 3600
+    counts = np.bincount(cells, minlength=7 * 24).reshape(7, 24)
+    likes = np.bincount(cells, weights=metrics.likes[dated], minlength=7 * 24).reshape(7, 24)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        averages = np.where(counts > 0, likes / counts, 0.0)
+    return counts, averages
+
+
+def engagement_rate(metrics, followers):
+    """(likes + comentarios) / seguidores en % por post, o None sin número de seguidores"""
+    if not isinstance(followers, (int, float)) or followers <= 0:
+        return None
+    return (metrics.likes + metrics.comments) * 100.0 / followers
+
+
+def percentiles(values, points=(25, 50, 75, 90, 99)):
+    if not len(values):
+        return {}
+    return dict(zip(points, np.percentile(values, points).tolist()))
+
+
+def rolling_average(metrics, window=7):
+    """Media móvil de likes sobre los posts en orden cronológico (una ventana completa por valor)"""
+    order = np.argsort(metrics.taken_at, kind='stable')
+    likes = metrics.likes[order].astype(np.float64)
+    if len(likes) < window:
+        return np.zeros(0)
+    sums = np.cumsum(likes)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums[window - 1:] / window
+
+
+def analyze(metrics, followers=None, window=7):
+    """Todos los agregados de un dataset"""
+    rates = engagement_rate(metrics, followers)
+    counts, averages = by_weekday_hour(metrics)
+    return {
+        'summary': summary(metrics),
+        'by_media_type': by_media_type(metrics),
+        'by_month': by_month(metrics),
+        'weekday_hour_counts': counts,
+        'weekday_hour_avg_likes': averages,
+        'engagement_rate': None if rates is None else {
+            'mean': float(rates.mean()) if len(rates) else 0.0,
+            'percentiles': percentiles(rates),
+        },
+        'like_percentiles': percentiles(metrics.likes),
+        'rolling_likes': rolling_average(metrics, window),
+    }
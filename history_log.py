@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Historial de versiones de un dataset como log de deltas (instagram_{username}.history.jsonl)
+
+Uso:
+    python history_log.py rebuild instagram_cliniqmedellin.history.jsonl --at 2025-06-19T12:00:00 --output antes.json
+    python history_log.py series instagram_cliniqmedellin.history.jsonl [--post POST_ID]
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+from records import json_default
+
+# Listas que crecen por append en cada merge: el delta solo guarda los elementos añadidos
+APPEND_KEYS = (('comments_detailed', 'comments'), ('likes_detailed', 'likes'))
+
+
+def diff_post(old, new):
+    """Delta entre dos versiones de un post ({} si no cambió)"""
+    delta = {}
+    changed = {key: value for key, value in new.items()
+               if key not in ('comments_detailed', 'likes_detailed') and (key not in old or old[key] != value)}
+    for key, short in APPEND_KEYS:
+        if key not in new:
+            continue
+        old_items, new_items = old.get(key), new[key]
+        if old_items is not None and new_items[:len(old_items)] == old_items:
+            if len(new_items) > len(old_items):
+                delta[short] = new_items[len(old_items):]
+        else:
+            changed[key] = new_items
+    removed = [key for key in old if key not in new]
+    if changed:
+        delta['set'] = changed
+    if removed:
+        delta['unset'] = removed
+    return delta
+
+
+def apply_post(post, delta):
+    """Aplica en su lugar el delta de diff_post"""
+    post.update(delta.get('set', {}))
+    for key in delta.get('unset', []):
+        post.pop(key, None)
+    for key, short in APPEND_KEYS:
+        if short in delta:
+            post.setdefault(key, []).extend(delta[short])
+    return post
+
+
+class HistoryLog:
+    """Log append-only de versiones de un dataset.
+
+    La primera entrada es una copia completa ('base'); cada guardado incremental
+    posterior añade solo lo que cambió respecto a la versión cargada: posts nuevos,
+    campos modificados (contadores incluidos), comentarios y likes añadidos y el
+    orden del feed si varió. Cada entrada lleva su marca de tiempo 'at'.
+
+    Si la versión cargada no es la última registrada (el dataset se reescribió con un
+    scrape completo, el sink NDJSON o un guardado periódico), se registra de nuevo
+    como base antes del delta.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def exists(self):
+        return os.path.exists(self.filename) and os.path.getsize(self.filename) > 0
+
+    def _write(self, record):
+        with open(self.filename, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=json_default) + '\n')
+
+    def last_at(self):
+        """'at' de la última entrada, leyendo solo el final del archivo (None si está vacío)"""
+        if not self.exists():
+            return None
+        with open(self.filename, 'rb') as f:
+            end = f.seek(0, os.SEEK_END)
+            tail = b''
+            # Retroceder por bloques hasta el salto de línea que precede a la última entrada
+            while end > 0 and b'\n' not in tail.rstrip(b'\n'):
+                start = max(0, end - 65536)
+                f.seek(start)
+                tail = f.read(end - start) + tail
+                end = start
+        line = tail.rstrip(b'\n').rsplit(b'\n', 1)[-1]
+        return json.loads(line)['at']
+
+    def append(self, current, previous=None):
+        """Registra la versión `current` del dataset; `previous` es la versión sobre la que se combinó"""
+        at = (current.get('metadata') or {}).get('last_full_scrape') or datetime.now().isoformat()
+        if not self.exists() and not previous:
+            self._write({'at': at, 'base': current})
+            return
+        if previous:
+            base_at = (previous.get('metadata') or {}).get('last_full_scrape')
+            if base_at is None or base_at != self.last_at():
+                # previous no es la última versión registrada: los deltas no se aplicarían sobre ella
+                self._write({'at': base_at or at, 'base': previous})
+
+        record = {'at': at}
+        old_profile = (previous.get('profile') or {}) if previous else {}
+        profile = {key: value for key, value in (current.get('profile') or {}).items() if old_profile.get(key) != value}
+        if profile:
+            record['profile'] = profile
+        if current.get('metadata') is not None:
+            record['metadata'] = current['metadata']
+
+        old_posts = {post['id']: post for post in (previous or {}).get('posts', [])}
+        posts = {}
+        for post in current.get('posts', []):
+            old = old_posts.get(post['id'])
+            if old is None:
+                posts[post['id']] = {'post': post}
+            elif old is not post:
+                delta = diff_post(old, post)
+                if delta:
+                    posts[post['id']] = delta
+        if posts:
+            record['posts'] = posts
+        order = [post['id'] for post in current.get('posts', [])]
+        if order != list(old_posts):
+            record['order'] = order
+        self._write(record)
+
+    def records(self):
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def versions(self):
+        """Marcas de tiempo de todas las versiones registradas"""
+        return [record['at'] for record in self.records()]
+
+    def rebuild(self, at=None):
+        """Dataset tal como estaba en `at` (ISO o datetime; None = última versión). None si es anterior al log"""
+        if isinstance(at, datetime):
+            at = at.isoformat()
+        profile, metadata, posts, order = None, None, None, []
+        for record in self.records():
+            if at is not None and record['at'] > at:
+                break
+            if 'base' in record:
+                base = record['base']
+                profile = dict(base.get('profile') or {})
+                metadata = base.get('metadata')
+                posts = {post['id']: post for post in base.get('posts', [])}
+                order = list(posts)
+                continue
+            if posts is None:
+                continue
+            profile.update(record.get('profile', {}))
+            metadata = record.get('metadata', metadata)
+            for post_id, delta in record.get('posts', {}).items():
+                if 'post' in delta:
+                    posts[post_id] = delta['post']
+                elif post_id in posts:
+                    apply_post(posts[post_id], delta)
+            order = record.get('order', order)
+        if posts is None:
+            return None
+        # Logs escritos antes del re-base pueden tener deltas de posts que no están en la base
+        result = {'profile': profile, 'posts': [posts[post_id] for post_id in order if post_id in posts]}
+        if metadata is not None:
+            result['metadata'] = metadata
+        return result
+
+    def series(self, post_id=None):
+        """{post_id: [{'at', 'like_count', 'comment_count'}]} con un punto por versión en que cambió algún contador"""
+        series = {}
+        last = {}
+
+        def add_point(at, pid, post):
+            counters = dict(last.get(pid, {}))
+            counters.update((key, post[key]) for key in ('like_count', 'comment_count') if key in post)
+            if counters and counters != last.get(pid):
+                last[pid] = counters
+                series.setdefault(pid, []).append({'at': at, **counters})
+
+        for record in self.records():
+            if 'base' in record:
+                # Un re-base repite los posts: solo suma puntos si algún contador cambió
+                for post in record['base'].get('posts', []):
+                    if post_id is None or post['id'] == post_id:
+                        add_point(record['at'], post['id'], post)
+                continue
+            for pid, delta in record.get('posts', {}).items():
+                if post_id is None or pid == post_id:
+                    add_point(record['at'], pid, delta.get('post') or delta.get('set', {}))
+        return series
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruye versiones anteriores y series de contadores")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    rebuild_parser = subparsers.add_parser('rebuild', help="Dataset en una fecha dada")
+    rebuild_parser.add_argument('history')
+    rebuild_parser.add_argument('--at', help="Fecha ISO (por defecto, la última versión)")
+    rebuild_parser.add_argument('--output', help="Archivo JSON de salida (por defecto, stdout)")
+
+    series_parser = subparsers.add_parser('series', help="Likes/comentarios de cada post a lo largo del tiempo")
+    series_parser.add_argument('history')
+    series_parser.add_argument('--post', help="ID del post")
+
+    subparsers.add_parser('versions', help="Versiones registradas").add_argument('history')
+
+    args = parser.parse_args()
+    history = HistoryLog(args.history)
+
+    if args.command == 'versions':
+        for at in history.versions():
+            print(at)
+    elif args.command == 'series':
+        for post_id, points in history.series(args.post).items():
+            print(post_id)
+            for point in points:
+                print(f"  {point['at']}  likes={point.get('like_count')}  comments={point.get('comment_count')}")
+    else:
+        data = history.rebuild(args.at)
+        if data is None:
+            print(f"[!] No version recorded at or before {args.at}")
+            return
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            print(f"[+] Version with {len(data['posts'])} posts saved to {args.output}")
+        else:
+            print(json.dumps(data, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
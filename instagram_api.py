@@ -0,0 +1,493 @@
+"""
+Cliente de la API web de Instagram: sesión, login y paginadores de feed, comentarios y likes
+"""
+
+import json
+import time
+from datetime import datetime
+
+import requests
+
+from config import Config
+from media import select_images, select_videos
+from rate_limiter import AdaptiveRateLimiter
+from records import Comment, CommentUser, Like, Post, Reply
+from retry_policy import build_retry_policies, parse_retry_after
+
+
+class InstagramAPI:
+    def __init__(self):
+        self.session = requests.Session()
+        self.session_id = None
+        self.csrf_token = None
+        self.user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        self.headers = {
+            'User-Agent': self.user_agent,
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive',
+            'X-IG-App-ID': '936619743392459',
+            'X-Requested-With': 'XMLHttpRequest',
+        }
+        self.logged_in = False
+        self.base_url = 'https://www.instagram.com'
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=Config.RATE_LIMIT_INITIAL,
+            min_rate=Config.RATE_LIMIT_MIN,
+            max_rate=Config.RATE_LIMIT_MAX
+        )
+        self.retry_policies = build_retry_policies()
+        self.request_budget = None  # RequestBudget compartido (opcional)
+        self.response_listener = None  # Callback(status_code) por cada respuesta (None = error de red)
+        self.sender = None  # Callable(url, referer, timeout) que elige la sesión de cada request (SessionPool)
+        self.cache = None  # ResponseCache compartido (opcional)
+
+    def _notify_response(self, status_code, latency):
+        self.rate_limiter.record_response(status_code, latency)
+        if self.response_listener:
+            self.response_listener(status_code)
+
+    def request_stats(self):
+        """Estado del rate limiter para monitoreo"""
+        return self.rate_limiter.stats()
+
+    def _send(self, url, referer, timeout):
+        """Un intento de GET con la sesión y el rate limiter de esta cuenta"""
+        # Copia por request: varios hilos pueden usar la misma sesión a la vez
+        headers = dict(self.headers)
+        headers.update({
+            'X-CSRFToken': self.csrf_token,
+            'Referer': referer
+        })
+        self.rate_limiter.acquire()
+
+        start = time.monotonic()
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            self._notify_response(None, time.monotonic() - start)
+            raise
+        self._notify_response(response.status_code, time.monotonic() - start)
+        return response
+
+    def _get(self, url, endpoint='default', referer='https://www.instagram.com/', gui_logger=None):
+        """Ejecuta un GET autenticado con rate limiter, presupuesto global y reintentos.
+
+        Los reintentos repiten exactamente la misma URL (mismo cursor max_id), así
+        que un 5xx transitorio no corta la paginación. Devuelve la última respuesta
+        o relanza el último error de red si se agotan los reintentos. Si hay un
+        ResponseCache, una entrada vigente se devuelve sin tocar la red. Con un
+        `sender` (SessionPool), cada intento puede salir por otra cuenta.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, url)
+            if cached is not None:
+                return cached
+
+        policy = self.retry_policies.get(endpoint, self.retry_policies['default'])
+        send = self.sender or self._send
+
+        for attempt in range(policy.max_retries + 1):
+            if self.request_budget is not None:
+                self.request_budget.consume()
+
+            try:
+                response = send(url, referer, policy.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= policy.max_retries:
+                    raise
+                delay = policy.backoff(attempt)
+                if gui_logger:
+                    gui_logger(f"[!] {endpoint} request failed ({e.__class__.__name__}), retry {attempt + 1}/{policy.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if response.status_code == 200 and self.cache is not None:
+                self.cache.put(endpoint, url, response.text)
+            if not policy.should_retry(response.status_code) or attempt >= policy.max_retries:
+                return response
+
+            delay = policy.backoff(attempt, parse_retry_after(response.headers.get('Retry-After')))
+            if gui_logger:
+                gui_logger(f"[!] {endpoint} HTTP {response.status_code}, retry {attempt + 1}/{policy.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    def login(self, username, password, gui_logger=None):
+        try:
+            self.session.get('https://www.instagram.com/', headers=self.headers)
+            self.csrf_token = self.session.cookies.get('csrftoken')
+
+            login_url = 'https://www.instagram.com/accounts/login/ajax/'
+            login_data = {
+                'username': username,
+                'enc_password': f'#PWD_INSTAGRAM_BROWSER:0:{int(datetime.now().timestamp())}:{password}',
+                'queryParams': {},
+                'optIntoOneTap': 'false'
+            }
+
+            self.headers.update({
+                'X-CSRFToken': self.csrf_token,
+                'Referer': 'https://www.instagram.com/',
+                'Content-Type': 'application/x-www-form-urlencoded'
+            })
+
+            response = self.session.post(login_url, data=login_data, headers=self.headers)
+            response_data = response.json()
+
+            if response_data.get('authenticated'):
+                self.logged_in = True
+                self.session_id = self.session.cookies.get('sessionid')
+                self.csrf_token = self.session.cookies.get('csrftoken')
+                if gui_logger:
+                    gui_logger("[+] Successfully logged in to Instagram")
+                return True
+            else:
+                if gui_logger:
+                    gui_logger(f"[!] Login failed: {response_data.get('message', 'Unknown error')}")
+                return False
+
+        except Exception as e:
+            if gui_logger:
+                gui_logger(f"[!] Login error: {str(e)}")
+            return False
+
+    def save_cookies(self, filename):
+        """Guarda las cookies de la sesión para reutilizarlas sin volver a hacer login"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(requests.utils.dict_from_cookiejar(self.session.cookies), f, indent=2)
+
+    def load_cookies(self, filename, gui_logger=None):
+        """Restaura una sesión guardada con save_cookies"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                cookies = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            if gui_logger:
+                gui_logger(f"[!] Could not load cookies from {filename}: {e}")
+            return False
+
+        self.session.cookies.update(cookies)
+        self.session_id = cookies.get('sessionid')
+        self.csrf_token = cookies.get('csrftoken')
+        self.logged_in = bool(self.session_id)
+        if gui_logger and not self.logged_in:
+            gui_logger(f"[!] No session cookie found in {filename}")
+        return self.logged_in
+
+    def get_user_info(self, username, gui_logger=None):
+        if not self.logged_in:
+            if gui_logger:
+                gui_logger("[!] Not logged in")
+            return None
+
+        try:
+            url = f"{self.base_url}/api/v1/users/web_profile_info/?username={username}"
+            response = self._get(url, 'profile', f'https://www.instagram.com/{username}/', gui_logger)
+            if response.status_code == 200:
+                return response.json().get('data', {}).get('user', None)
+            elif response.status_code == 404:
+                if gui_logger:
+                    gui_logger(f"[!] User @{username} not found")
+            else:
+                if gui_logger:
+                    gui_logger(f"[!] API Error: HTTP {response.status_code}")
+            return None
+
+        except Exception as e:
+            if gui_logger:
+                gui_logger(f"[!] User info error: {str(e)}")
+            return None
+
+    def get_user_posts(self, user_id, count=12, gui_logger=None, checkpoint=None,
+                       known_ids=None, min_taken_at=None, stop_after_known=6, refresh_window=0):
+        """Extrae el feed del usuario.
+
+        En modo incremental (known_ids y/o min_taken_at) la paginación se detiene al
+        encontrar `stop_after_known` posts conocidos seguidos; los primeros
+        `refresh_window` posts conocidos se devuelven igualmente para refrescar sus
+        contadores. Solo cuentan como conocidos los ids de known_ids: un post no visto
+        anterior a min_taken_at (desarchivado, colaboración aceptada después) se devuelve
+        siempre y no interrumpe la racha de conocidos.
+        """
+        if not self.logged_in:
+            if gui_logger:
+                gui_logger("[!] Not logged in")
+            return []
+
+        try:
+            posts = []
+            next_max_id = None
+            retrieved = 0
+            incremental = known_ids is not None or min_taken_at is not None
+            known_ids = known_ids or set()
+            consecutive_known = 0
+            known_seen = 0
+            reached_known = False
+
+            # Reanudar desde el checkpoint si este paginador quedó a medias
+            state = checkpoint.resume_state('feed', user_id) if checkpoint else None
+            if state:
+                posts = state['items']
+                next_max_id = state['cursor']
+                retrieved = len(posts)
+                if not next_max_id:
+                    return posts
+
+            while retrieved < count:
+                url = f"{self.base_url}/api/v1/feed/user/{user_id}/?count={min(12, count-retrieved)}"
+                if next_max_id:
+                    url += f"&max_id={next_max_id}"
+
+                response = self._get(url, 'feed', gui_logger=gui_logger)
+                if response.status_code != 200:
+                    if gui_logger:
+                        gui_logger(f"[!] Posts API Error: HTTP {response.status_code}")
+                    break
+
+                data = response.json()
+                page_start = len(posts)
+                for item in data.get('items', []):
+                    if retrieved >= count:
+                        break
+
+                    if incremental:
+                        taken_at = item.get('taken_at')
+                        if item.get('id') in known_ids:
+                            consecutive_known += 1
+                            known_seen += 1
+                            if consecutive_known >= stop_after_known and known_seen >= refresh_window:
+                                reached_known = True
+                            if known_seen > refresh_window:
+                                if reached_known:
+                                    break
+                                continue
+                        elif min_taken_at is None or taken_at is None or taken_at > min_taken_at:
+                            # Un post fijado antiguo no corta la paginación si le siguen posts nuevos
+                            consecutive_known = 0
+
+                    post = Post(
+                        id=item.get('id'),
+                        code=item.get('code'),
+                        media_type=item.get('media_type'),
+                        like_count=item.get('like_count'),
+                        comment_count=item.get('comment_count'),
+                        caption=item.get('caption', {}).get('text', '') if item.get('caption') else '',
+                        taken_at=item.get('taken_at'),
+                        image_versions=select_images(item.get('image_versions2', {}).get('candidates', [])),
+                        video_versions=select_videos(item.get('video_versions', [])) if item.get('media_type') == 2 else []
+                    )
+                    posts.append(post)
+                    retrieved += 1
+                    if gui_logger:
+                        gui_logger(f"[+] Retrieved post {retrieved}/{count}")
+                    if reached_known:
+                        break
+
+                next_max_id = data.get('next_max_id') if not reached_known else None
+                if reached_known and gui_logger:
+                    gui_logger(f"[+] Reached {consecutive_known} already known posts, stopping feed pagination")
+                if checkpoint:
+                    checkpoint.record_page('feed', user_id, posts[page_start:], next_max_id)
+                if not next_max_id:
+                    break
+
+            return posts
+
+        except Exception as e:
+            if gui_logger:
+                gui_logger(f"[!] Posts error: {str(e)}")
+            return posts
+
+    def get_post_comments(self, media_id, count=50, gui_logger=None, fetch_replies=True, checkpoint=None,
+                          known_ids=None, min_created_at=None):
+        """Extrae comentarios detallados de un post específico.
+
+        Con known_ids y/o min_created_at solo devuelve comentarios nuevos y deja de
+        paginar en cuanto una página completa ya es conocida.
+        """
+        if not self.logged_in:
+            if gui_logger:
+                gui_logger("[!] Not logged in")
+            return []
+
+        try:
+            comments = []
+            next_max_id = None
+            retrieved = 0
+            known_ids = known_ids or set()
+
+            # Reanudar desde el checkpoint si este paginador quedó a medias
+            state = checkpoint.resume_state('comments', media_id) if checkpoint else None
+            if state:
+                comments = state['items']
+                next_max_id = state['cursor']
+                retrieved = len(comments)
+                if not next_max_id:
+                    return comments
+
+            while retrieved < count:
+                url = f"{self.base_url}/api/v1/media/{media_id}/comments/"
+                if next_max_id:
+                    url += f"?max_id={next_max_id}"
+
+                response = self._get(url, 'comments', gui_logger=gui_logger)
+                if response.status_code != 200:
+                    if gui_logger:
+                        gui_logger(f"[!] Comments API Error: HTTP {response.status_code}")
+                    break
+
+                data = response.json()
+                page_start = len(comments)
+                page_items = data.get('comments', [])
+                for comment in page_items:
+                    if retrieved >= count:
+                        break
+
+                    created_at = comment.get('created_at')
+                    if comment.get('pk') in known_ids or (
+                        min_created_at is not None and created_at is not None and created_at <= min_created_at
+                    ):
+                        continue
+
+                    comment_data = Comment(
+                        id=comment.get('pk'),
+                        text=comment.get('text'),
+                        created_at=comment.get('created_at'),
+                        like_count=comment.get('comment_like_count'),
+                        user=CommentUser(
+                            id=comment.get('user', {}).get('pk'),
+                            username=comment.get('user', {}).get('username'),
+                            full_name=comment.get('user', {}).get('full_name'),
+                            is_verified=comment.get('user', {}).get('is_verified')
+                        ),
+                        child_comment_count=comment.get('child_comment_count', 0),
+                        replies=[]
+                    )
+                    
+                    # Extraer respuestas al comentario si existen
+                    if fetch_replies and comment.get('child_comment_count', 0) > 0:
+                        replies = self.get_comment_replies(comment.get('pk'), gui_logger)
+                        comment_data['replies'] = replies
+
+                    comments.append(comment_data)
+                    retrieved += 1
+
+                # Página completa ya conocida: lo que sigue es más antiguo
+                page_known = bool(page_items) and len(comments) == page_start and retrieved < count
+                next_max_id = data.get('next_max_id') if not page_known else None
+                if checkpoint:
+                    checkpoint.record_page('comments', media_id, comments[page_start:], next_max_id)
+                if not next_max_id:
+                    break
+
+            return comments
+
+        except Exception as e:
+            if gui_logger:
+                gui_logger(f"[!] Comments error: {str(e)}")
+            return comments
+
+    def get_comment_replies(self, comment_id, gui_logger=None):
+        """Extrae respuestas a un comentario específico"""
+        try:
+            url = f"{self.base_url}/api/v1/media/{comment_id}/comments/"
+            response = self._get(url, 'replies', gui_logger=gui_logger)
+            if response.status_code != 200:
+                return []
+
+            data = response.json()
+            replies = []
+            
+            for reply in data.get('comments', []):
+                reply_data = Reply(
+                    id=reply.get('pk'),
+                    text=reply.get('text'),
+                    created_at=reply.get('created_at'),
+                    like_count=reply.get('comment_like_count'),
+                    user=CommentUser(
+                        id=reply.get('user', {}).get('pk'),
+                        username=reply.get('user', {}).get('username'),
+                        full_name=reply.get('user', {}).get('full_name'),
+                        is_verified=reply.get('user', {}).get('is_verified')
+                    )
+                )
+                replies.append(reply_data)
+
+            return replies
+
+        except Exception as e:
+            if gui_logger:
+                gui_logger(f"[!] Replies error: {str(e)}")
+            return []
+
+    def get_post_likes(self, media_id, count=50, gui_logger=None, checkpoint=None, known_usernames=None):
+        """Extrae la lista de usuarios que dieron like a un post.
+
+        Con known_usernames solo devuelve likes nuevos y deja de paginar en cuanto
+        una página completa ya es conocida.
+        """
+        if not self.logged_in:
+            if gui_logger:
+                gui_logger("[!] Not logged in")
+            return []
+
+        try:
+            likes = []
+            next_max_id = None
+            retrieved = 0
+            known_usernames = known_usernames or set()
+
+            # Reanudar desde el checkpoint si este paginador quedó a medias
+            state = checkpoint.resume_state('likers', media_id) if checkpoint else None
+            if state:
+                likes = state['items']
+                next_max_id = state['cursor']
+                retrieved = len(likes)
+                if not next_max_id:
+                    return likes
+
+            while retrieved < count:
+                url = f"{self.base_url}/api/v1/media/{media_id}/likers/"
+                if next_max_id:
+                    url += f"?max_id={next_max_id}"
+
+                response = self._get(url, 'likers', gui_logger=gui_logger)
+                if response.status_code != 200:
+                    if gui_logger:
+                        gui_logger(f"[!] Likes API Error: HTTP {response.status_code}")
+                    break
+
+                data = response.json()
+                page_start = len(likes)
+                page_items = data.get('users', [])
+                for user in page_items:
+                    if retrieved >= count:
+                        break
+                    if user.get('username') in known_usernames:
+                        continue
+
+                    like_data = Like(
+                        user_id=user.get('pk'),
+                        username=user.get('username'),
+                        full_name=user.get('full_name'),
+                        profile_pic_url=user.get('profile_pic_url'),
+                        is_verified=user.get('is_verified'),
+                        is_private=user.get('is_private')
+                    )
+                    likes.append(like_data)
+                    retrieved += 1
+
+                # Página completa ya conocida: lo que sigue es más antiguo
+                page_known = bool(page_items) and len(likes) == page_start and retrieved < count
+                next_max_id = data.get('next_max_id') if not page_known else None
+                if checkpoint:
+                    checkpoint.record_page('likers', media_id, likes[page_start:], next_max_id)
+                if not next_max_id:
+                    break
+
+            return likes
+
+        except Exception as e:
+            if gui_logger:
+                gui_logger(f"[!] Likes error: {str(e)}")
+            return likes
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Política de retención de medios: qué versiones de imagen y vídeo se guardan por post y en qué forma
+
+Uso:
+    python media.py migrate                                   # todos los instagram_*.json / *.igsnap
+    python media.py migrate instagram_cliniqmedellin.json
+"""
+
+import argparse
+import glob
+import os
+
+from config import Config
+
+# Campos de cada versión que se conservan (el resto, como scans_profile, no lo usa ningún script)
+IMAGE_FIELDS = ('width', 'height')
+VIDEO_FIELDS = ('width', 'height', 'type', 'bandwidth')
+# Etiquetas de media_type que muestran los reportes
+MEDIA_TYPES = {1: "Imagen", 2: "Video", 8: "Carrusel"}
+
+
+def media_label(media_type):
+    return MEDIA_TYPES.get(media_type, f"Tipo {media_type}")
+
+
+def candidate_url(candidate):
+    """URL completa de una versión, esté guardada entera ('url') o partida ('base' + 'params')"""
+    if 'url' in candidate:
+        return candidate['url']
+    base = candidate.get('base')
+    if base is None:
+        return None
+    params = candidate.get('params')
+    return f"{base}?{params}" if params else base
+
+
+def best_candidate(candidates):
+    """Versión de mayor resolución (la primera en caso de empate) o None"""
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: (c.get('width') or 0) * (c.get('height') or 0))
+
+
+def _compact(candidate, fields, split_urls):
+    result = {field: candidate[field] for field in fields if field in candidate}
+    url = candidate_url(candidate)
+    if url is None:
+        return result
+    if split_urls:
+        # La ruta del CDN es estable; la query (firma, caducidad, parámetros de caché) va aparte
+        base, _, params = url.partition('?')
+        result['base'] = base
+        if params:
+            result['params'] = params
+    else:
+        result['url'] = url
+    return result
+
+
+def select_images(candidates, policy=None, split_urls=None):
+    """Aplica MEDIA_IMAGE_POLICY a image_versions2.candidates.
+
+    policy: "best" (solo la mayor), "all" o una lista de anchos a conservar
+    (si ninguno coincide se guarda la mayor).
+    """
+    policy = Config.MEDIA_IMAGE_POLICY if policy is None else policy
+    split_urls = Config.MEDIA_SPLIT_URLS if split_urls is None else split_urls
+    candidates = [c for c in candidates or [] if isinstance(c, dict)]
+    if not candidates:
+        return []
+
+    if policy == 'all':
+        selected = candidates
+    elif policy == 'best':
+        selected = [best_candidate(candidates)]
+    else:
+        widths = set(policy)
+        selected = []
+        seen = set()
+        for candidate in candidates:
+            size = (candidate.get('width'), candidate.get('height'))
+            if size[0] in widths and size not in seen:
+                seen.add(size)
+                selected.append(candidate)
+        if not selected:
+            selected = [best_candidate(candidates)]
+    return [_compact(candidate, IMAGE_FIELDS, split_urls) for candidate in selected]
+
+
+def select_videos(versions, policy=None, split_urls=None):
+    """Aplica MEDIA_VIDEO_POLICY: "none", "best" (mayor resolución y bitrate) o "all" """
+    policy = Config.MEDIA_VIDEO_POLICY if policy is None else policy
+    split_urls = Config.MEDIA_SPLIT_URLS if split_urls is None else split_urls
+    versions = [v for v in versions or [] if isinstance(v, dict)]
+    if policy == 'none' or not versions:
+        return []
+    if policy == 'best':
+        versions = [max(versions, key=lambda v: (
+            (v.get('width') or 0) * (v.get('height') or 0), v.get('bandwidth') or 0
+        ))]
+    return [_compact(version, VIDEO_FIELDS, split_urls) for version in versions]
+
+
+def apply_policy(post):
+    """Reduce en su lugar las versiones de imagen y vídeo de un post. Devuelve True si cambió"""
+    changed = False
+    for key, select in (('image_versions', select_images), ('video_versions', select_videos)):
+        if key in post:
+            selected = select(post[key])
+            if selected != post[key]:
+                post[key] = selected
+                changed = True
+    return changed
+
+
+def migrate(filename):
+    """Aplica la política a un dataset existente. Devuelve (tamaño antes, tamaño después) en bytes"""
+    from storage import JsonStorage
+    from snapshot import SnapshotStorage
+
+    storage = SnapshotStorage(filename) if filename.endswith('.igsnap') else JsonStorage(filename)
+    before = os.path.getsize(filename)
+    data = storage.load()
+    if data is None:
+        return before, before
+    changed = [apply_policy(post) for post in data.get('posts', [])]
+    if any(changed):
+        storage.save(data)
+    return before, os.path.getsize(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aplica la política de retención de medios a datasets existentes")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help="Reduce image_versions/video_versions en disco")
+    migrate_parser.add_argument('files', nargs='*')
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob('instagram_*.json') + glob.glob('instagram_*.igsnap'))
+    if not files:
+        print("[!] No datasets found")
+        return
+    for filename in files:
+        try:
+            before, after = migrate(filename)
+        except (OSError, ValueError) as e:
+            print(f"[!] {filename}: {e}")
+            continue
+        print(f"[+] {filename}: {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Escritura en streaming: cada post se añade a un archivo NDJSON en cuanto se completa
+"""
+
+import json
+import os
+import threading
+
+from atomic_file import atomic_write
+from config import Config
+from dataset_summary import SUMMARY_FIELDS, summarize
+from records import json_default
+from user_table import UserTable
+
+
+class NDJsonSink:
+    """Vuelca posts, comentarios y likes a disco a medida que llegan.
+
+    Cada post se escribe como un grupo contiguo de líneas: un registro "post"
+    seguido de sus registros "comment" y "like". finalize() indexa los grupos por
+    offset de bytes y los compacta, uno a uno y en el orden del feed, en el layout
+    canónico de instagram_{username}.json, sin cargar el dataset completo.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._file = open(filename, 'w', encoding='utf-8')
+
+    def _dumps(self, record):
+        return json.dumps(record, ensure_ascii=False, default=json_default) + '\n'
+
+    def write_profile(self, profile):
+        with self._lock:
+            self._file.write(self._dumps({'type': 'profile', 'data': profile}))
+            self._file.flush()
+
+    def write_post(self, post, position):
+        """Añade un post con sus detalles; si se repite, prevalece el último"""
+        data = {key: value for key, value in post.items() if key not in ('comments_detailed', 'likes_detailed')}
+        lines = [self._dumps({
+            'type': 'post',
+            'position': position,
+            'has_comments': 'comments_detailed' in post,
+            'has_likes': 'likes_detailed' in post,
+            'data': data
+        })]
+        lines += [self._dumps({'type': 'comment', 'data': comment}) for comment in post.get('comments_detailed', [])]
+        lines += [self._dumps({'type': 'like', 'data': like}) for like in post.get('likes_detailed', [])]
+        with self._lock:
+            self._file.write(''.join(lines))
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _index(self):
+        """Recorre el stream y devuelve (perfil, {posición: (offset_inicio, offset_fin)}, {posición: métricas})
+
+        Las métricas son los campos del resumen de cada post, con sus comentarios y
+        likes contados ('comments_detailed_count', 'likes_detailed_count').
+        """
+        profile = None
+        groups = {}
+        metrics = {}
+        current = None
+        offset = 0
+        with open(self.filename, 'rb') as f:
+            for line in f:
+                start = offset
+                offset += len(line)
+                # Solo se decodifican las cabeceras; comentarios y likes se cuentan y se saltan por offset
+                if line.startswith(b'{"type": "comment"'):
+                    if current is not None:
+                        current[2]['comments_detailed_count'] += 1
+                    continue
+                if line.startswith(b'{"type": "like"'):
+                    if current is not None:
+                        current[2]['likes_detailed_count'] += 1
+                    continue
+                record = json.loads(line)
+                if current is not None:
+                    groups[current[0]] = (current[1], start)
+                    metrics[current[0]] = current[2]
+                    current = None
+                if record['type'] == 'profile':
+                    profile = record['data']
+                elif record['type'] == 'post':
+                    data = record['data']
+                    post_metrics = {field: data[field] for field in SUMMARY_FIELDS if field in data}
+                    post_metrics['comments_detailed_count'] = post_metrics['likes_detailed_count'] = 0
+                    current = (record['position'], start, post_metrics)
+        if current is not None:
+            groups[current[0]] = (current[1], offset)
+            metrics[current[0]] = current[2]
+        return profile, groups, metrics
+
+    def _read_post(self, f, start, end):
+        f.seek(start)
+        post = None
+        comments = []
+        likes = []
+        for line in f.read(end - start).splitlines():
+            record = json.loads(line)
+            if record['type'] == 'post':
+                post = record['data']
+                has_comments, has_likes = record['has_comments'], record['has_likes']
+            elif record['type'] == 'comment':
+                comments.append(record['data'])
+            else:
+                likes.append(record['data'])
+        if has_comments:
+            post['comments_detailed'] = comments
+        if has_likes:
+            post['likes_detailed'] = likes
+        return post
+
+    def finalize(self, output, metadata=None, remove=True, normalize=None):
+        """Compacta el stream en `output` con el formato de json.dump(indent=2). Devuelve los posts escritos
+
+        metadata (con el resumen agregado de los posts) se escribe antes que los posts,
+        como en los guardados de IncrementalDataManager.
+        """
+        self.close()
+        profile, groups, metrics = self._index()
+        metadata = dict(metadata or {}, summary=summarize(metrics[position] for position in sorted(groups)))
+        users = UserTable() if (Config.NORMALIZE_USERS if normalize is None else normalize) else None
+
+        def indented(value, level):
+            return json.dumps(value, indent=2, ensure_ascii=False, default=json_default).replace('\n', '\n' + ' ' * level)
+
+        with open(self.filename, 'rb') as source, atomic_write(output) as out:
+            out.write('{\n  "profile": ' + indented(profile, 2) + ',\n  "metadata": ' + indented(metadata, 2))
+            out.write(',\n  "posts": [')
+            for i, position in enumerate(sorted(groups)):
+                post = self._read_post(source, *groups[position])
+                if users is not None:
+                    post = users.ref_post(post)
+                out.write((',\n    ' if i else '\n    ') + indented(post, 4))
+            out.write('\n  ]' if groups else ']')
+            if users is not None:
+                out.write(',\n  "users": ' + indented(users.users, 2))
+            out.write('\n}')
+
+        if remove:
+            os.remove(self.filename)
+        return len(groups)
@@ -0,0 +1,73 @@
+"""
+Guardados periódicos durante una ejecución larga, en un hilo aparte del bucle de extracción
+"""
+
+import threading
+import time
+
+
+class PeriodicFlusher:
+    """Guarda el progreso cada `every_posts` posts completados o cada `every_seconds` segundos.
+
+    notify(post) se llama desde on_post_done: solo guarda una copia superficial del
+    post y, si toca, encola la lista de posts completados. La combinación con el
+    dataset y la escritura las hace write(posts) en el hilo del flusher. Si un
+    guardado sigue en curso cuando llega otro, solo se conserva el más reciente.
+    """
+
+    def __init__(self, write, every_posts=25, every_seconds=120, logger=None):
+        self.write = write
+        self.every_posts = every_posts
+        self.every_seconds = every_seconds
+        self.logger = logger
+        self.flushes = 0
+        self._done = {}
+        self._since_flush = 0
+        self._last_flush = time.monotonic()
+        self._pending = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='periodic-flush', daemon=True)
+        self._thread.start()
+
+    def log(self, message):
+        if self.logger:
+            self.logger(message)
+
+    def notify(self, post):
+        # Copia superficial: el post puede seguir cambiando mientras el hilo lo serializa
+        self._done[post['id']] = dict(post)
+        self._since_flush += 1
+        now = time.monotonic()
+        if ((self.every_posts and self._since_flush >= self.every_posts)
+                or (self.every_seconds and now - self._last_flush >= self.every_seconds)):
+            self._since_flush = 0
+            self._last_flush = now
+            with self._condition:
+                self._pending = list(self._done.values())
+                self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                posts, self._pending = self._pending, None
+            started = time.monotonic()
+            try:
+                self.write(posts)
+            except Exception as e:
+                self.log(f"[!] Periodic flush error: {str(e)}")
+                continue
+            self.flushes += 1
+            self.log(f"[+] Progress flushed: {len(posts)} completed posts ({time.monotonic() - started:.2f}s)")
+
+    def close(self):
+        """Descarta el guardado pendiente y espera al que esté en curso (antes del guardado final)"""
+        with self._condition:
+            self._closed = True
+            self._pending = None
+            self._condition.notify()
+        self._thread.join()
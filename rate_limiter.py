@@ -0,0 +1,91 @@
+"""
+Rate limiter adaptativo (token bucket) compartido por todos los endpoints
+"""
+
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+    """Token bucket cuya tasa se ajusta según la salud de las respuestas.
+
+    - 429 o 5xx: la tasa se multiplica por `backoff_factor`.
+    - Latencia por encima de `latency_threshold`: la tasa baja un 20%.
+    - `healthy_streak` respuestas sanas seguidas: la tasa sube `increase_step`.
+    """
+
+    def __init__(self, rate=1 / 3, min_rate=0.1, max_rate=2.0, burst=1,
+                 increase_step=0.05, backoff_factor=0.5, latency_threshold=2.0,
+                 healthy_streak=10):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.backoff_factor = backoff_factor
+        self.latency_threshold = latency_threshold
+        self.healthy_streak = healthy_streak
+
+        self._rate = min(max(rate, min_rate), max_rate)
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._streak = 0
+        self._lock = threading.Lock()
+
+        self.total_requests = 0
+        self.throttled_responses = 0
+        self.error_responses = 0
+
+    @property
+    def current_rate(self):
+        """Tasa actual en requests por segundo"""
+        with self._lock:
+            return self._rate
+
+    def _refill(self, now):
+        elapsed = now - self._last_refill
+        self._tokens = min(self.burst, self._tokens + elapsed * self._rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible"""
+        with self._lock:
+            self._refill(time.monotonic())
+            # Reservar el token aunque quede en negativo: cada hilo espera su turno
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0
+            self.total_requests += 1
+        if wait > 0:
+            time.sleep(wait)
+
+    def record_response(self, status_code, latency):
+        """Ajusta la tasa a partir del código HTTP (None = error de red) y la latencia"""
+        with self._lock:
+            if status_code is None or status_code == 429 or status_code >= 500:
+                if status_code == 429:
+                    self.throttled_responses += 1
+                else:
+                    self.error_responses += 1
+                self._set_rate(self._rate * self.backoff_factor)
+                self._streak = 0
+            elif latency > self.latency_threshold:
+                self._set_rate(self._rate * 0.8)
+                self._streak = 0
+            else:
+                self._streak += 1
+                if self._streak >= self.healthy_streak:
+                    self._set_rate(self._rate + self.increase_step)
+                    self._streak = 0
+
+    def _set_rate(self, rate):
+        self._refill(time.monotonic())
+        self._rate = min(max(rate, self.min_rate), self.max_rate)
+
+    def stats(self):
+        """Resumen para monitoreo"""
+        with self._lock:
+            return {
+                'rate': round(self._rate, 3),
+                'total_requests': self.total_requests,
+                'throttled_responses': self.throttled_responses,
+                'error_responses': self.error_responses
+            }
@@ -0,0 +1,212 @@
+"""
+Registros con __slots__ para posts, comentarios, respuestas y likes
+
+Se comportan como los dicts que sustituyen (post['like_count'], .get(), .items(),
+'comments_detailed' in post...), pero cada campo conocido ocupa un slot en vez de
+una entrada de diccionario. Las claves desconocidas se guardan en un dict aparte.
+Un slot sin asignar equivale a una clave ausente.
+"""
+
+from collections.abc import Mapping, MutableMapping
+
+
+class Record(MutableMapping):
+    """Base de los registros: mapping mutable con los campos de FIELDS en slots"""
+
+    __slots__ = ('_extra',)
+    FIELDS = ()
+    _FIELD_SET = frozenset()
+    # Campo -> clase del valor o de los elementos de la lista (p. ej. comments_detailed -> Comment)
+    NESTED = {}
+
+    def __init__(self, *args, **kwargs):
+        self._extra = None
+        if args:
+            self.update(*args)
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    @classmethod
+    def from_dict(cls, data, memo=None):
+        """Convierte un dict (y sus listas anidadas) en registro.
+
+        memo ({id(dict): registro}) conserva los objetos compartidos, como los likes
+        internados por UserTable: cada dict se convierte una sola vez.
+        """
+        if isinstance(data, Record):
+            return data
+        if memo is not None:
+            record = memo.get(id(data))
+            if record is not None:
+                return record
+        record = cls.__new__(cls)
+        record._extra = None
+        fields, nested = cls._FIELD_SET, cls.NESTED
+        for key, value in data.items():
+            item_class = nested.get(key)
+            if item_class is not None:
+                if isinstance(value, list):
+                    value = [item_class.from_dict(item, memo) if isinstance(item, Mapping) else item for item in value]
+                elif isinstance(value, Mapping):
+                    value = item_class.from_dict(value, memo)
+            if key in fields:
+                setattr(record, key, value)
+            else:
+                if record._extra is None:
+                    record._extra = {}
+                record._extra[key] = value
+        if memo is not None:
+            memo[id(data)] = record
+        return record
+
+    def to_dict(self):
+        """dict superficial con las claves presentes (los registros anidados se mantienen)"""
+        result = {}
+        for field in self.FIELDS:
+            try:
+                result[field] = getattr(self, field)
+            except AttributeError:
+                pass
+        if self._extra:
+            result.update(self._extra)
+        return result
+
+    # --- Protocolo de mapping ---
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for field in self.FIELDS if hasattr(self, field)) + len(self._extra or ())
+
+    def __contains__(self, key):
+        if key in self._FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def get(self, key, default=None):
+        if key in self._FIELD_SET:
+            return getattr(self, key, default)
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def values(self):
+        return self.to_dict().values()
+
+    def copy(self):
+        """Copia superficial (como dict.copy)"""
+        record = self.__class__.__new__(self.__class__)
+        record._extra = dict(self._extra) if self._extra else None
+        for field in self.FIELDS:
+            try:
+                setattr(record, field, getattr(self, field))
+            except AttributeError:
+                pass
+        return record
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == dict(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+
+class CommentUser(Record):
+    __slots__ = ('id', 'username', 'full_name', 'is_verified')
+    FIELDS = __slots__
+
+
+class Reply(Record):
+    __slots__ = ('id', 'text', 'created_at', 'like_count', 'user')
+    FIELDS = __slots__
+    NESTED = {'user': CommentUser}
+
+
+class Comment(Record):
+    __slots__ = ('id', 'text', 'created_at', 'like_count', 'user', 'child_comment_count', 'replies')
+    FIELDS = __slots__
+    NESTED = {'user': CommentUser, 'replies': Reply}
+
+
+class Like(Record):
+    __slots__ = ('user_id', 'username', 'full_name', 'profile_pic_url', 'is_verified', 'is_private')
+    FIELDS = __slots__
+
+
+class Post(Record):
+    __slots__ = ('id', 'code', 'media_type', 'like_count', 'comment_count', 'caption', 'taken_at',
+                 'image_versions', 'video_versions', 'comments_detailed', 'likes_detailed', 'last_updated')
+    FIELDS = __slots__
+    NESTED = {'comments_detailed': Comment, 'likes_detailed': Like}
+
+
+def posts_from_dicts(posts):
+    """Convierte los posts de un dataset cargado, conservando los objetos compartidos"""
+    memo = {}
+    return [Post.from_dict(post, memo) if isinstance(post, Mapping) else post for post in posts]
+
+
+def json_default(value):
+    """Para json.dump(default=...): serializa los registros como sus dicts"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+def to_builtin(value):
+    """Copia profunda con los registros convertidos en dicts (para marshal)"""
+    if isinstance(value, Mapping):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_builtin(item) for item in value]
+    return value
@@ -0,0 +1,54 @@
+"""
+Planificador de refresco: decide qué posts existentes vale la pena volver a procesar
+"""
+
+import time
+
+
+class RefreshScheduler:
+    """Prioriza posts existentes cuyos contadores crecieron desde el último scrape.
+
+    prioridad = (peso_comentarios * Δcomentarios + peso_likes * Δlikes) * 0.5 ** (edad_días / vida_media)
+
+    Solo cuentan los incrementos (un contador que baja no trae datos nuevos) y solo
+    los de los detalles que se van a extraer.
+    """
+
+    def __init__(self, max_posts=20, comment_weight=3.0, like_weight=1.0, half_life_days=30,
+                 extract_comments=True, extract_likes=True):
+        self.max_posts = max_posts
+        self.comment_weight = comment_weight if extract_comments else 0
+        self.like_weight = like_weight if extract_likes else 0
+        self.half_life_days = half_life_days
+
+    def priority(self, stored_post, fresh_post, now=None):
+        """Prioridad de refresco de un post (0 = nada nuevo que buscar)"""
+        comment_delta = max((fresh_post.get('comment_count') or 0) - (stored_post.get('comment_count') or 0), 0)
+        like_delta = max((fresh_post.get('like_count') or 0) - (stored_post.get('like_count') or 0), 0)
+        change = self.comment_weight * comment_delta + self.like_weight * like_delta
+        if change <= 0:
+            return 0.0
+
+        taken_at = fresh_post.get('taken_at') or stored_post.get('taken_at')
+        if not taken_at:
+            return change
+        age_days = max((now or time.time()) - taken_at, 0) / 86400
+        return change * 0.5 ** (age_days / self.half_life_days)
+
+    def schedule(self, fresh_posts, stored_posts):
+        """Devuelve [(prioridad, post)] de los posts a refrescar, de mayor a menor prioridad.
+
+        fresh_posts: posts recién leídos del feed; stored_posts: dict id -> post guardado.
+        """
+        now = time.time()
+        queue = []
+        for post in fresh_posts:
+            stored = stored_posts.get(post['id'])
+            if stored is None:
+                continue
+            score = self.priority(stored, post, now)
+            if score > 0:
+                queue.append((score, post))
+
+        queue.sort(key=lambda entry: entry[0], reverse=True)
+        return queue[:self.max_posts]
@@ -0,0 +1,79 @@
+"""
+Caché de filas de reporte en SQLite, indexada por el hash del JSON de cada post
+"""
+
+import hashlib
+import os
+import sqlite3
+
+# Cambiar al modificar el formato de las filas para invalidar las cachés existentes
+RENDER_VERSION = b'1'
+
+
+def post_key(raw):
+    """Hash del JSON crudo de un post (bytes tal como están en el archivo)"""
+    return hashlib.blake2b(raw, digest_size=16, key=RENDER_VERSION).hexdigest()
+
+
+def cache_filename(output):
+    return os.path.splitext(output)[0] + '.render_cache.sqlite3'
+
+
+class RenderCache:
+    """Fragmento Markdown y likes de cada post ya renderizado.
+
+    Cada ejecución marca las entradas que usa; commit() guarda las nuevas y elimina
+    las de posts que ya no están en el dataset o que cambiaron.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.hits = 0
+        self.misses = 0
+        self._used = set()
+        self._new = []
+        self._conn = sqlite3.connect(filename)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rows (
+                key TEXT PRIMARY KEY,
+                cells TEXT NOT NULL,
+                likes INTEGER NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key):
+        """(celdas, likes) del post, o None si no está en caché"""
+        row = self._conn.execute("SELECT cells, likes FROM rows WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.add(key)
+        return row
+
+    def put(self, key, cells, likes):
+        self._used.add(key)
+        self._new.append((key, cells, likes))
+
+    def commit(self):
+        """Guarda las filas nuevas y descarta las que no se usaron en esta ejecución"""
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO rows (key, cells, likes) VALUES (?, ?, ?)", self._new)
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS used (key TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM used")
+            self._conn.executemany("INSERT OR IGNORE INTO used (key) VALUES (?)", ((key,) for key in self._used))
+            self._conn.execute("DELETE FROM rows WHERE key NOT IN (SELECT key FROM used)")
+        self._new = []
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Motor de reportes Markdown para cualquier instagram_*.json
+
+Las filas se escriben en el archivo a medida que se generan: el documento nunca
+se construye entero en memoria y los posts se leen uno a uno por offset.
+
+Uso:
+    python report_engine.py instagram_cliniqmedellin.json
+    python report_engine.py instagram_*.json --layout simple
+    python report_engine.py instagram_martaveno.json --output instagram_martaveno_table_completo.md
+    python report_engine.py --dir reportes/ --jobs 4
+
+Con varios datasets, cada uno se genera en un proceso distinto (por defecto, uno
+por núcleo disponible) y se muestra el tiempo de cada archivo.
+
+Las filas ya generadas se guardan en {salida}.render_cache.sqlite3 indexadas por el
+hash del JSON de cada post: solo se vuelven a generar los posts nuevos o modificados
+(--no-cache para desactivarlo).
+"""
+
+import argparse
+import datetime
+import glob
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+
+from atomic_file import atomic_write
+from dataset_summary import real_likes
+from media import candidate_url
+from render_cache import RenderCache, cache_filename, post_key
+from streaming_loader import PostFile, load_header
+
+# Campos que decodifica cada fila (likes_detailed solo se cuenta)
+ROW_FIELDS = ('taken_at', 'image_versions', 'caption', 'like_count', 'comment_count', 'comments_detailed', 'code')
+
+LAYOUTS = {
+    # Todos los posts, encabezado "Caption"
+    'simple': {
+        'caption_header': 'Caption',
+        'only_valid': False,
+    },
+    # Solo posts con id y fecha, encabezado "Caption Completo" y total de posts válidos
+    'complete': {
+        'caption_header': 'Caption Completo',
+        'only_valid': True,
+    },
+}
+
+
+def format_date(timestamp):
+    """Convierte timestamp a fecha legible"""
+    return datetime.datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+
+
+def format_count(value):
+    return f"{value:,}" if isinstance(value, int) else str(value)
+
+
+def get_best_image_url(post):
+    """Obtiene la mejor resolución de imagen disponible"""
+    image_versions = post.get('image_versions', [])
+    if image_versions:
+        # Ordenar por resolución (ancho * alto) y tomar la mayor
+        best_image = max(image_versions, key=lambda x: (x.get('width') or 0) * (x.get('height') or 0))
+        return candidate_url(best_image) or 'N/A'
+    return 'N/A'
+
+
+def get_post_url(code):
+    """Genera la URL de la publicación de Instagram"""
+    if code and code != 'N/A':
+        return f"https://www.instagram.com/p/{code}/"
+    return 'N/A'
+
+
+def get_top_comment(post):
+    """Obtiene el comentario con más likes"""
+    comments = post.get('comments_detailed', [])
+    if not comments:
+        return 'Sin comentarios'
+
+    top_comment = max(comments, key=lambda x: x.get('like_count') or 0)
+    comment_text = top_comment.get('text', 'Sin texto')
+    likes = top_comment.get('like_count', 0)
+
+    # Truncar comentario si es muy largo
+    if len(comment_text) > 100:
+        comment_text = comment_text[:97] + "..."
+
+    return f"{comment_text} ({likes} likes)"
+
+
+def clean_caption(caption):
+    """Caption completo en una sola línea (sin truncar)"""
+    if not caption:
+        return 'Sin caption'
+    return ' '.join(caption.replace('\n', ' ').replace('\r', ' ').split())
+
+
+def escape_markdown(text):
+    """Escapa caracteres que pueden romper la tabla"""
+    if not text:
+        return text
+    for char in ('|', '[', ']', '*', '_'):
+        text = text.replace(char, '\\' + char)
+    return text
+
+
+def get_real_likes(post):
+    """like_count, o el número de likes extraídos si la API devolvió un valor bajo (<= 3)"""
+    return real_likes(post.get('like_count') or 0, post.get('likes_detailed_count', 0))
+
+
+def render_cells(post):
+    """Celdas de la fila de un post, sin el número de fila"""
+    date = format_date(post['taken_at']) if post.get('taken_at') else 'N/A'
+
+    image_url = get_best_image_url(post)
+    image_link = f"![Imagen]({image_url})" if image_url != 'N/A' else 'Sin imagen'
+
+    caption = escape_markdown(clean_caption(post.get('caption', '')))
+    comments_count = post.get('comment_count') or 0
+    top_comment = escape_markdown(get_top_comment(post))
+
+    post_url = get_post_url(post.get('code', 'N/A'))
+    post_link = f"[Ver post]({post_url})" if post_url != 'N/A' else 'N/A'
+
+    return f"{date} | {image_link} | {caption} | {get_real_likes(post)} | {comments_count} | {top_comment} | {post_link} |"
+
+
+def render_row(index, post):
+    return f"\n| {index} | {render_cells(post)}"
+
+
+def default_output(filename):
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return os.path.join(os.path.dirname(filename), f"{stem}_table.md")
+
+
+def write_table(filename, output=None, layout='complete', cache=True):
+    """Genera la tabla Markdown de `filename` en `output`. Devuelve un resumen del reporte"""
+    settings = LAYOUTS[layout]
+    output = output or default_output(filename)
+    render_cache = RenderCache(cache_filename(output)) if cache else None
+    try:
+        return _write_table(filename, output, settings, render_cache)
+    finally:
+        if render_cache is not None:
+            render_cache.close()
+
+
+def _write_table(filename, output, settings, render_cache):
+    header = load_header(filename)
+    profile = header.get('profile') or {}
+    metadata = header.get('metadata') or {}
+
+    with PostFile(filename) as posts:
+        # Primera pasada: solo id y fecha de cada post, para ordenar sin decodificar el resto
+        entries = []
+        for start, end in posts.spans():
+            key = posts.read(start, fields=('id', 'taken_at'))
+            if settings['only_valid'] and not (key.get('id') and key.get('taken_at')):
+                continue
+            entries.append((key.get('taken_at') or 0, start, end))
+        # Más recientes primero (orden estable, como sorted(..., reverse=True))
+        entries.sort(key=lambda entry: entry[0], reverse=True)
+
+        total_likes = 0
+        max_likes = min_likes = None
+        with atomic_write(output) as out:
+            caption_header = settings['caption_header']
+            out.write(f"""# 📊 Posts de Instagram - @{profile.get('username', 'N/A')}
+
+**Perfil:** {profile.get('full_name', 'N/A')}  
+**Seguidores:** {format_count(profile.get('followers_count', 'N/A'))}  
+**Total de posts:** {len(entries)}  
+**Última actualización:** {metadata.get('last_full_scrape', 'N/A')}
+
+---
+
+| # | Fecha | Imagen | {caption_header} | Likes | Comentarios | Top Comentario | Link Post |
+|---|-------|--------|{'-' * (len(caption_header) + 2)}|-------|-------------|----------------|-----------|""")
+
+            for index, (_, start, end) in enumerate(entries, 1):
+                cached = digest = None
+                if render_cache is not None:
+                    digest = post_key(posts.buf[start:end])
+                    cached = render_cache.get(digest)
+                if cached is not None:
+                    cells, likes = cached
+                else:
+                    post = posts.read(start, fields=ROW_FIELDS, count=('likes_detailed',))
+                    cells, likes = render_cells(post), get_real_likes(post)
+                    if render_cache is not None:
+                        render_cache.put(digest, cells, likes)
+                out.write(f"\n| {index} | {cells}")
+                total_likes += likes
+                max_likes = likes if max_likes is None else max(max_likes, likes)
+                min_likes = likes if min_likes is None else min(min_likes, likes)
+
+            avg_likes = total_likes / len(entries) if entries else 0
+            valid_line = f"- **Total de posts válidos:** {len(entries)}\n" if settings['only_valid'] else ""
+            out.write(f"""
+
+---
+
+## 📈 Estadísticas Resumen
+
+{valid_line}- **Total de likes:** {total_likes:,}
+- **Promedio de likes por post:** {avg_likes:.1f}
+- **Post con más engagement:** {max_likes or 0} likes
+- **Post con menos engagement:** {min_likes or 0} likes
+
+---
+
+*Generado el {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
+""")
+
+    if render_cache is not None:
+        render_cache.commit()
+    return {'output': output, 'posts': len(entries), 'profile': profile, 'total_likes': total_likes,
+            'avg_likes': avg_likes, 'cached': render_cache.hits if render_cache is not None else 0}
+
+
+def preview(output, head=15, tail=5):
+    """Primeras y últimas líneas del reporte, leyendo el archivo en streaming"""
+    with open(output, 'r', encoding='utf-8') as f:
+        first = [line.rstrip('\n') for line in islice(f, head)]
+        f.seek(0)
+        last = deque(f, maxlen=tail)
+    # Mismo resultado que text.split('\n')[-tail:] (incluida la línea vacía final)
+    return first, ''.join(last).split('\n')[-tail:]
+
+
+def render_file(filename, output=None, layout='complete', cache=True):
+    """Genera un reporte y devuelve (filename, resumen o None, mensaje de error, segundos)"""
+    started = time.perf_counter()
+    report = error = None
+    if not os.path.exists(filename):
+        error = f"No se encontró el archivo {filename}"
+    else:
+        try:
+            report = write_table(filename, output, layout, cache)
+        except ValueError:
+            error = f"El archivo {filename} no tiene un formato JSON válido"
+        except Exception as e:
+            # Un dataset dañado no debe detener el resto del lote
+            error = f"No se pudo generar el reporte de {filename}: {e!r}"
+    return filename, report, error, time.perf_counter() - started
+
+
+def render_batch(files, layout='complete', jobs=None, cache=True):
+    """Genera los reportes de `files` en un pool de procesos. Devuelve los resultados según terminan"""
+    jobs = min(jobs or os.cpu_count() or 1, len(files))
+    if jobs <= 1:
+        for filename in files:
+            yield render_file(filename, layout=layout, cache=cache)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(render_file, filename, None, layout, cache) for filename in files]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera tablas Markdown de posts a partir de instagram_*.json")
+    parser.add_argument('files', nargs='*', help="Datasets (por defecto, todos los instagram_*.json)")
+    parser.add_argument('--dir', default='.', help="Directorio donde buscar los instagram_*.json")
+    parser.add_argument('--output', help="Archivo de salida (solo con un dataset)")
+    parser.add_argument('--layout', choices=sorted(LAYOUTS), default='complete')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help="Procesos en paralelo (por defecto, los núcleos disponibles)")
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help="Genera todas las filas sin usar ni actualizar la caché")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(args.dir, 'instagram_*.json')))
+    if args.output and len(files) != 1:
+        parser.error("--output requires exactly one dataset")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if not files:
+        print("❌ No se encontraron archivos instagram_*.json")
+        return
+
+    started = time.perf_counter()
+    if args.output:
+        results = [render_file(files[0], args.output, args.layout, args.cache)]
+    else:
+        results = render_batch(files, args.layout, args.jobs, args.cache)
+
+    generated = 0
+    for filename, report, error, elapsed in results:
+        if error:
+            print(f"❌ Error: {error}")
+            continue
+        generated += 1
+        print(f"✅ {report['output']}: {report['posts']} posts de @{report['profile'].get('username', 'N/A')}, "
+              f"{report['total_likes']:,} likes ({report['avg_likes']:.1f} por post) en {elapsed:.2f}s"
+              + (f", {report['cached']} filas en caché" if report['cached'] else ""))
+
+    if len(files) > 1:
+        print(f"⏱️  {generated}/{len(files)} reportes en {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
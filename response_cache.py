@@ -0,0 +1,137 @@
+"""
+Caché persistente de respuestas HTTP en un único archivo SQLite, con TTL por endpoint y LRU por tamaño
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class CachedResponse:
+    """Respuesta mínima compatible con requests.Response para los métodos de InstagramAPI"""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.headers = {}
+        self.from_cache = True
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ResponseCache:
+    """Guarda el cuerpo de las respuestas 200 indexado por URL (que incluye el cursor max_id).
+
+    Los aciertos no escriben en disco: el último acceso de cada URL se acumula en memoria
+    y se vuelca antes de expulsar entradas (en put), cada TOUCH_BATCH aciertos y al cerrar.
+    Perder los accesos pendientes (si el proceso termina sin close) solo altera el orden LRU.
+    """
+
+    TOUCH_BATCH = 256
+
+    def __init__(self, filename, ttls=None, max_bytes=50 * 1024 * 1024):
+        self.filename = filename
+        self.ttls = ttls or {}
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(filename, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+        self._conn.commit()
+
+    def get(self, endpoint, url):
+        """Devuelve un CachedResponse si hay una entrada vigente para la URL"""
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl <= 0:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, created_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            now = time.time()
+            if row is None or now - row[1] > ttl:
+                self.misses += 1
+                return None
+            self._touched[url] = now
+            if len(self._touched) >= self.TOUCH_BATCH:
+                self._flush_touches()
+                self._conn.commit()
+            self.hits += 1
+            return CachedResponse(200, row[0])
+
+    def _flush_touches(self):
+        if self._touched:
+            self._conn.executemany("UPDATE responses SET last_access = ? WHERE url = ?",
+                                   [(at, url) for url, at in self._touched.items()])
+            self._touched = {}
+
+    def put(self, endpoint, url, body):
+        """Guarda una respuesta y expulsa las menos usadas si se supera max_bytes"""
+        if self.ttls.get(endpoint, 0) <= 0:
+            return
+        size = len(body.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, endpoint, body, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, endpoint, body, size, now, now)
+            )
+            # El orden LRU de la expulsión necesita los accesos pendientes
+            self._touched.pop(url, None)
+            self._flush_touches()
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY last_access ASC"
+        ).fetchall():
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            self._touched = {}
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size
+        }
+
+    def close(self):
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,62 @@
+"""
+Políticas de reintento por endpoint: backoff exponencial con jitter y soporte de Retry-After
+"""
+
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from config import Config
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy:
+    """Define cuántas veces y con qué espera se reintenta un request"""
+
+    def __init__(self, max_retries=3, base_delay=2.0, max_delay=120.0, timeout=30,
+                 retry_statuses=RETRY_STATUSES):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.retry_statuses = retry_statuses
+
+    def should_retry(self, status_code):
+        return status_code in self.retry_statuses
+
+    def backoff(self, attempt, retry_after=None):
+        """Segundos a esperar antes del reintento número `attempt` (empezando en 0)"""
+        if retry_after is not None:
+            # El servidor manda: se respeta Retry-After aunque supere max_delay
+            return retry_after
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        # Equal jitter: la mitad fija y la otra mitad aleatoria
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+def parse_retry_after(value):
+    """Convierte la cabecera Retry-After (segundos o fecha HTTP) a segundos"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def build_retry_policies():
+    """Políticas por endpoint a partir de Config.MAX_RETRIES, Config.TIMEOUT y Config.RETRY_POLICIES"""
+    policies = {}
+    for endpoint in ('default', 'profile', 'feed', 'comments', 'replies', 'likers'):
+        options = {'max_retries': Config.MAX_RETRIES, 'timeout': Config.TIMEOUT}
+        options.update(Config.RETRY_POLICIES.get(endpoint, {}))
+        policies[endpoint] = RetryPolicy(**options)
+    return policies
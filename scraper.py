@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Servicio de scraping sin interfaz gráfica y punto de entrada de línea de comandos
+
+Uso:
+    python -m scraper login <cuenta> --cookies sesion.cookies.json
+    python -m scraper scrape <usuario> --max-posts 400 --cookies sesion.cookies.json
+"""
+
+import argparse
+import getpass
+import os
+import sys
+
+from config import Config
+from async_fetcher import AsyncDetailFetcher, RequestBudget
+from checkpoint import ScrapeCheckpoint
+from data_manager import IncrementalDataManager
+from history_log import HistoryLog
+from instagram_api import InstagramAPI
+from refresh_scheduler import RefreshScheduler
+from response_cache import ResponseCache
+from ndjson_sink import NDJsonSink
+from periodic_flush import PeriodicFlusher
+from storage import JsonStorage, open_storage
+from session_pool import SessionPool
+
+
+class ScrapeOptions:
+    """Opciones de una ejecución (equivalen a los controles de la interfaz)"""
+
+    def __init__(self, max_posts=Config.DEFAULT_MAX_POSTS, extract_comments=Config.EXTRACT_COMMENTS,
+                 extract_likes=Config.EXTRACT_LIKES, extract_replies=Config.EXTRACT_COMMENT_REPLIES,
+                 max_comments=Config.MAX_COMMENTS_PER_POST, max_likes=Config.MAX_LIKES_PER_POST,
+                 incremental=Config.INCREMENTAL_MODE, save_json=Config.SAVE_JSON_DEFAULT, output_dir='.'):
+        self.max_posts = max_posts
+        self.extract_comments = extract_comments
+        self.extract_likes = extract_likes
+        self.extract_replies = extract_replies
+        self.max_comments = max_comments
+        self.max_likes = max_likes
+        self.incremental = incremental
+        self.save_json = save_json
+        self.output_dir = output_dir
+
+    def checkpoint_params(self, username):
+        """Parámetros que identifican la ejecución en el journal de checkpoint"""
+        return {
+            'username': username,
+            'max_posts': self.max_posts,
+            'extract_comments': self.extract_comments,
+            'extract_likes': self.extract_likes,
+            'extract_replies': self.extract_replies,
+            'max_comments': self.max_comments,
+            'max_likes': self.max_likes,
+            'incremental': self.incremental
+        }
+
+
+class Scraper:
+    """Orquesta un scrape completo: perfil, feed, detalles, merge incremental y guardado.
+
+    `api` puede ser un InstagramAPI autenticado o un SessionPool; `logger` recibe
+    cada línea de progreso (print en la CLI, el área de log en la interfaz).
+    """
+
+    def __init__(self, api, logger=None):
+        self.api = api
+        self.logger = logger or (lambda message: print(message, flush=True))
+
+    def log(self, message):
+        self.logger(message)
+
+    def run(self, username, options=None):
+        """Ejecuta el scrape de @username. Devuelve el resultado o None si falla"""
+        options = options or ScrapeOptions()
+        self.log(f"[+] Starting scrape for @{username}")
+
+        # Inicializar gestor de datos incrementales
+        storage = open_storage(username, options.output_dir)
+        filename = storage.location
+        history = None
+        if Config.BACKUP_PREVIOUS_DATA:
+            history = HistoryLog(os.path.join(options.output_dir, f"instagram_{username}.history.jsonl"))
+        data_manager = IncrementalDataManager(filename, storage, history)
+        self.api.request_budget = RequestBudget(Config.REQUEST_BUDGET)
+
+        # Journal de checkpoint: si una ejecución anterior con los mismos parámetros
+        # se interrumpió, se reanuda desde sus cursores y posts completados
+        checkpoint = ScrapeCheckpoint(
+            os.path.join(options.output_dir, f"instagram_{username}.checkpoint.jsonl"),
+            options.checkpoint_params(username)
+        )
+        if checkpoint.load():
+            self.log(f"[+] Resuming from checkpoint: {len(checkpoint.completed_posts)} posts already completed")
+
+        # Cargar datos existentes si el modo incremental está activado
+        if options.incremental:
+            if data_manager.load_existing_data():
+                self.log(f"[+] Loaded existing data from {filename}")
+                existing_posts = len(data_manager.existing_data.get('posts', []) if data_manager.existing_data else [])
+                self.log(f"[+] Found {existing_posts} existing posts")
+            else:
+                self.log(f"[+] No existing data found, starting fresh scrape")
+        incremental = options.incremental and bool(data_manager.existing_data)
+        sink = None
+
+        try:
+            user_info = self.api.get_user_info(username, self.log)
+            if not user_info:
+                self.log("[!] Failed to get user info")
+                return None
+
+            result = {'profile': self.build_profile(user_info), 'posts': []}
+            self.log_profile(result['profile'])
+
+            if not user_info.get('is_private'):
+                new_posts = self.fetch_posts(user_info['id'], options, data_manager, checkpoint, incremental)
+                sink = self.open_sink(username, storage, options, incremental)
+                if sink:
+                    sink.write_profile(result['profile'])
+                    self.log(f"[+] Streaming posts to {sink.filename}")
+
+                # Extraer detalles adicionales según las opciones seleccionadas
+                if options.extract_comments or options.extract_likes:
+                    self.log("\n[+] Fetching post details...")
+                    posts_to_process = self.select_posts_to_process(new_posts, options, data_manager, incremental)
+                    on_post_done = self.stream_to(sink, new_posts) if sink else None
+                    flusher = self.open_flusher(result['profile'], new_posts, data_manager, options, incremental)
+                    if flusher:
+                        on_post_done = flusher.notify
+                    try:
+                        skipped = self.fetch_details(posts_to_process, options, data_manager if incremental else None,
+                                                     checkpoint, on_post_done)
+                    finally:
+                        if flusher:
+                            flusher.close()
+                    if skipped:
+                        # Sin ellos en el dataset, la próxima ejecución los trata como nuevos
+                        new_posts = [post for post in new_posts if post['id'] not in skipped]
+                        self.log(f"[!] {len(skipped)} posts left out of this save, they will be fetched on the next run")
+                else:
+                    # Mostrar información de likes incluso cuando no se extraen detalles
+                    self.log("\n[+] Posts summary with like counts:")
+                    for i, post in enumerate(new_posts):
+                        like_count = post.get('like_count', 0)
+                        comment_count = post.get('comment_count', 0)
+                        self.log(f"[+] Post {i+1}: ID: {post['id']} - Likes: {like_count} - Comments: {comment_count}")
+                        if sink:
+                            sink.write_post(post, i)
+
+                # Combinar datos si es modo incremental
+                if incremental:
+                    self.log("\n[+] Merging with existing data...")
+                    result['posts'] = data_manager.merge_posts_data(new_posts)
+                    self.log(f"[+] Final dataset: {len(result['posts'])} posts")
+                else:
+                    result['posts'] = new_posts
+
+            if sink:
+                metadata = data_manager.build_metadata(len(result['posts'])) if options.incremental else None
+                written = sink.finalize(storage.filename, metadata)
+                self.log(f"\n[+] Streamed {written} posts into {filename}")
+            elif options.save_json:
+                self.save(result, filename, data_manager, options)
+
+            self.log_statistics(result['posts'], data_manager.summary)
+            if self.api.request_budget.exhausted:
+                # Se conserva el journal: la próxima ejecución reanuda desde sus cursores
+                self.log(f"\n[!] Scrape finished partially: request budget of {Config.REQUEST_BUDGET} exhausted. "
+                         f"Run again to resume from {checkpoint.filename}")
+            else:
+                checkpoint.clear()
+                self.log("\n[+] Scrape completed successfully!")
+            return result
+
+        except Exception as e:
+            self.log(f"[!] Scrape error: {str(e)}")
+            return None
+        finally:
+            # En éxito el journal ya se eliminó; si no, queda cerrado para reanudar
+            checkpoint.close()
+            if sink:
+                sink.close()
+
+    def build_profile(self, user_info):
+        return {
+            'id': user_info.get('id'),
+            'username': user_info.get('username'),
+            'full_name': user_info.get('full_name'),
+            'biography': user_info.get('biography'),
+            'profile_pic_url': user_info.get('profile_pic_url_hd'),
+            'followers_count': user_info.get('edge_followed_by', {}).get('count'),
+            'following_count': user_info.get('edge_follow', {}).get('count'),
+            'is_private': user_info.get('is_private'),
+            'is_verified': user_info.get('is_verified'),
+            'external_url': user_info.get('external_url')
+        }
+
+    def log_profile(self, profile):
+        self.log("\n[+] Profile Information:")
+        self.log(f"ID: {profile['id']}")
+        self.log(f"Username: @{profile['username']}")
+        self.log(f"Full Name: {profile['full_name']}")
+        self.log(f"Bio: {profile['biography']}")
+        self.log(f"Followers: {profile['followers_count']}")
+        self.log(f"Following: {profile['following_count']}")
+        self.log(f"Private: {'Yes' if profile['is_private'] else 'No'}")
+        self.log(f"Verified: {'Yes' if profile['is_verified'] else 'No'}")
+
+    def fetch_posts(self, user_id, options, data_manager, checkpoint, incremental):
+        self.log("\n[+] Fetching posts...")
+        feed_options = {}
+        # Con un dataset que ya cubre max_posts, detener el feed al llegar a posts conocidos;
+        # si tiene menos, se pagina completo para completar el histórico
+        if (incremental and Config.INCREMENTAL_EARLY_STOP
+                and len(data_manager.existing_data.get('posts', [])) >= options.max_posts):
+            feed_options = {
+                'known_ids': data_manager.get_existing_post_ids(),
+                'min_taken_at': data_manager.get_latest_taken_at(),
+                'stop_after_known': Config.INCREMENTAL_STOP_AFTER_KNOWN,
+                'refresh_window': Config.INCREMENTAL_REFRESH_WINDOW
+            }
+        new_posts = self.api.get_user_posts(user_id, options.max_posts, self.log, checkpoint=checkpoint, **feed_options)
+
+        if incremental:
+            existing_post_ids = data_manager.get_existing_post_ids()
+            new_count = sum(1 for post in new_posts if post['id'] not in existing_post_ids)
+            self.log(f"\n[+] Found {new_count} new posts out of {len(new_posts)} total")
+        else:
+            self.log(f"\n[+] Retrieved {len(new_posts)} posts")
+        return new_posts
+
+    def select_posts_to_process(self, new_posts, options, data_manager, incremental):
+        """En modo incremental: posts nuevos + existentes cuyos contadores crecieron"""
+        if not incremental:
+            return new_posts
+
+        existing_post_ids = data_manager.get_existing_post_ids()
+        posts_to_process = [post for post in new_posts if post['id'] not in existing_post_ids]
+        if Config.REFRESH_EXISTING_POSTS:
+            scheduler = RefreshScheduler(
+                max_posts=Config.REFRESH_MAX_POSTS,
+                comment_weight=Config.REFRESH_COMMENT_WEIGHT,
+                like_weight=Config.REFRESH_LIKE_WEIGHT,
+                half_life_days=Config.REFRESH_HALF_LIFE_DAYS,
+                extract_comments=options.extract_comments,
+                extract_likes=options.extract_likes
+            )
+            stored_posts = {post['id']: post for post in data_manager.existing_data.get('posts', [])}
+            refresh_queue = scheduler.schedule(new_posts, stored_posts)
+            for score, post in refresh_queue:
+                stored = stored_posts[post['id']]
+                self.log(f"[+] Refresh queued: {post['id']} - priority {score:.1f} - "
+                         f"comments {stored.get('comment_count')}→{post.get('comment_count')}, "
+                         f"likes {stored.get('like_count')}→{post.get('like_count')}")
+            posts_to_process += [post for _, post in refresh_queue]
+        return posts_to_process
+
+    def open_sink(self, username, storage, options, incremental):
+        """Sink NDJSON para scrapes sin datos previos que combinar (backend JSON)"""
+        if not (Config.STREAM_NDJSON and options.save_json and isinstance(storage, JsonStorage)) or incremental:
+            return None
+        return NDJsonSink(os.path.join(options.output_dir, f"instagram_{username}.ndjson"))
+
+    def open_flusher(self, profile, posts, data_manager, options, incremental):
+        """Guardados periódicos del dataset combinado mientras se extraen los detalles (modo incremental)"""
+        if not (Config.PERIODIC_FLUSH and options.save_json and incremental):
+            return None
+        positions = {post['id']: i for i, post in enumerate(posts)}
+
+        def write(completed):
+            # Solo posts con todos sus detalles: un corte deja el dataset anterior más lo completado
+            completed.sort(key=lambda post: positions[post['id']])
+            merged = data_manager.merged_view(completed)
+            data_manager.storage.save({
+                'profile': profile,
+                'posts': merged,
+                'metadata': data_manager.build_metadata(len(merged))
+            }, {post['id'] for post in completed})
+
+        return PeriodicFlusher(write, Config.FLUSH_EVERY_POSTS, Config.FLUSH_EVERY_SECONDS, self.log)
+
+    def stream_to(self, sink, posts):
+        positions = {post['id']: i for i, post in enumerate(posts)}
+
+        def on_post_done(post):
+            sink.write_post(post, positions[post['id']])
+            # Los detalles ya están en disco: no retenerlos hasta el final
+            post.pop('comments_detailed', None)
+            post.pop('likes_detailed', None)
+        return on_post_done
+
+    def fetch_details(self, posts_to_process, options, known_data, checkpoint, on_post_done=None):
+        # Cada cuenta del pool tiene su propio rate limiter: la concurrencia escala con ellas
+        concurrency = Config.MAX_CONCURRENT_REQUESTS * len(getattr(self.api, 'accounts', [self.api]))
+        self.log(f"[+] Processing {len(posts_to_process)} posts with concurrency {concurrency}")
+
+        # En modo incremental los paginadores solo traen comentarios y likes nuevos
+        fetcher = AsyncDetailFetcher(self.api, concurrency, self.log, checkpoint, known_data, on_post_done)
+        fetcher.run(
+            posts_to_process,
+            extract_comments=options.extract_comments,
+            extract_likes=options.extract_likes,
+            extract_replies=options.extract_replies,
+            max_comments=options.max_comments,
+            max_likes=options.max_likes
+        )
+        self.log(f"[+] Requests used: {self.api.request_budget.used}")
+        return fetcher.skipped
+
+    def save(self, result, filename, data_manager, options):
+        if options.incremental:
+            # Usar el gestor para guardar datos combinados
+            final_result = data_manager.save_merged_data(result['profile'], result['posts'])
+            self.log(f"\n[+] Incremental data saved to {filename}")
+            incremental_count = final_result.get('metadata', {}).get('incremental_updates', 1)
+            self.log(f"[+] This is incremental update #{incremental_count}")
+            if data_manager.history is not None:
+                self.log(f"[+] History delta appended to {data_manager.history.filename}")
+        else:
+            # Guardar normalmente (reemplaza el dataset anterior)
+            data_manager.storage.save(result)
+            self.log(f"\n[+] Data saved to {filename}")
+
+    def log_statistics(self, posts, summary=None):
+        # Mostrar estadísticas finales de likes (del resumen guardado, si lo hay)
+        if posts:
+            if summary is not None:
+                total_likes, total_comments = summary['total_likes'], summary['total_comments']
+            else:
+                total_likes = sum(post.get('like_count', 0) for post in posts)
+                total_comments = sum(post.get('comment_count', 0) for post in posts)
+            avg_likes = total_likes / len(posts)
+            avg_comments = total_comments / len(posts)
+
+            self.log(f"\n[+] === FINAL STATISTICS ===")
+            self.log(f"[+] Total Posts: {len(posts)}")
+            self.log(f"[+] Total Likes: {total_likes:,}")
+            self.log(f"[+] Total Comments: {total_comments:,}")
+            self.log(f"[+] Average Likes per Post: {avg_likes:.1f}")
+            self.log(f"[+] Average Comments per Post: {avg_comments:.1f}")
+
+        limiter_stats = self.api.request_stats()
+        self.log(f"[+] Request rate: {limiter_stats['rate']} req/s "
+                 f"({limiter_stats['total_requests']} requests, {limiter_stats['throttled_responses']} throttled)")
+        if getattr(self.api, 'cache', None) is not None:
+            cache_stats = self.api.cache.stats()
+            self.log(f"[+] Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                     f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 1024:.0f} KB)")
+
+
+def create_response_cache():
+    """ResponseCache configurado en Config, o None si está desactivado"""
+    if not Config.RESPONSE_CACHE:
+        return None
+    return ResponseCache(Config.RESPONSE_CACHE_FILE, Config.RESPONSE_CACHE_TTLS,
+                         Config.RESPONSE_CACHE_MAX_MB * 1024 * 1024)
+
+
+def build_session_pool(username, api, logger):
+    """Envuelve la sesión principal en un SessionPool si existe Config.ACCOUNTS_FILE"""
+    if not os.path.exists(Config.ACCOUNTS_FILE):
+        return api
+    pool = SessionPool(InstagramAPI, Config.ACCOUNT_COOLDOWN)
+    pool.cache = api.cache
+    pool.add_api(username, api)
+    added = pool.load_accounts(Config.ACCOUNTS_FILE, logger)
+    logger(f"[+] Session pool ready with {added + 1} accounts")
+    return pool
+
+
+def authenticate(args, logger):
+    """Crea una sesión autenticada a partir de cookies guardadas o de usuario y contraseña"""
+    api = InstagramAPI()
+    logged_in = False
+    if args.cookies and os.path.exists(args.cookies):
+        logged_in = api.load_cookies(args.cookies, logger)
+    if not logged_in and args.login_user:
+        password = os.environ.get('IG_PASSWORD') or getpass.getpass(f"Password for @{args.login_user}: ")
+        logged_in = api.login(args.login_user, password, logger)
+        if logged_in and args.cookies:
+            api.save_cookies(args.cookies)
+    if not logged_in:
+        return None
+    api.cache = create_response_cache()
+    return api
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m scraper', description="Instagram Scraper sin interfaz gráfica")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    login = subparsers.add_parser('login', help="Inicia sesión y guarda las cookies para ejecuciones posteriores")
+    login.add_argument('login_user', help="Cuenta de Instagram (password en IG_PASSWORD o por prompt)")
+    login.add_argument('--cookies', required=True, help="Archivo donde guardar las cookies de la sesión")
+
+    scrape = subparsers.add_parser('scrape', help="Extrae un perfil y guarda su dataset (JSON o SQLite según Config)")
+    scrape.add_argument('username', help="Perfil a extraer")
+    scrape.add_argument('--max-posts', type=int, default=Config.DEFAULT_MAX_POSTS)
+    scrape.add_argument('--max-comments', type=int, default=Config.MAX_COMMENTS_PER_POST)
+    scrape.add_argument('--max-likes', type=int, default=Config.MAX_LIKES_PER_POST)
+    scrape.add_argument('--no-comments', action='store_true', help="No extraer comentarios")
+    scrape.add_argument('--no-likes', action='store_true', help="No extraer likes")
+    scrape.add_argument('--no-replies', action='store_true', help="No extraer respuestas a comentarios")
+    scrape.add_argument('--full', action='store_true', help="Scrape completo en lugar de incremental")
+    scrape.add_argument('--no-save', action='store_true', help="No guardar el JSON")
+    scrape.add_argument('--output-dir', default='.')
+    scrape.add_argument('--cookies', help="Cookies guardadas con el comando login")
+    scrape.add_argument('--login-user', help="Cuenta para iniciar sesión si no hay cookies válidas")
+
+    args = parser.parse_args(argv)
+
+    def logger(message):
+        print(message, flush=True)
+
+    if args.command == 'login':
+        api = authenticate(args, logger)
+        if not api:
+            return 1
+        logger(f"[+] Session cookies saved to {args.cookies}")
+        return 0
+
+    api = authenticate(args, logger)
+    if not api:
+        logger("[!] Not logged in: use --cookies with a saved session or --login-user")
+        return 1
+    api = build_session_pool(args.login_user or 'main', api, logger)
+
+    options = ScrapeOptions(
+        max_posts=args.max_posts,
+        extract_comments=not args.no_comments,
+        extract_likes=not args.no_likes,
+        extract_replies=not args.no_replies,
+        max_comments=args.max_comments,
+        max_likes=args.max_likes,
+        incremental=not args.full,
+        save_json=not args.no_save,
+        output_dir=args.output_dir
+    )
+    result = Scraper(api, logger).run(args.username, options)
+    return 0 if result is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
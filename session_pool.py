@@ -0,0 +1,197 @@
+"""
+Pool de sesiones de varias cuentas para repartir requests y escalar el throughput
+"""
+
+import json
+import threading
+import time
+
+
+class PooledAccount:
+    """Una cuenta del pool con su propia sesión, rate limiter y salud"""
+
+    def __init__(self, name, api):
+        self.name = name
+        self.api = api
+        self.health = 1.0
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+
+    def is_available(self, now):
+        return now >= self.cooldown_until
+
+
+class SessionPool:
+    """Reparte las llamadas de feed, comentarios y likes entre varias cuentas.
+
+    Expone la misma interfaz que InstagramAPI, así que AsyncDetailFetcher y
+    run_scrape lo usan sin cambios. La cuenta se elige en cada request, no por
+    llamada: un paginador reparte sus páginas entre las cuentas y, tras un 429,
+    el reintento sale por otra. Cada cuenta conserva su propio
+    AdaptiveRateLimiter; un 429 baja su salud y la deja en cooldown.
+    """
+
+    def __init__(self, api_factory, cooldown=300):
+        self.api_factory = api_factory
+        self.cooldown = cooldown
+        self.accounts = []
+        self._request_budget = None
+        self._cache = None
+        self._lock = threading.Condition()
+
+    # --- Gestión de cuentas ---
+
+    def add_api(self, name, api):
+        """Agrega una sesión ya autenticada"""
+        api.request_budget = self._request_budget
+        if self._cache is not None:
+            api.cache = self._cache
+        account = PooledAccount(name, api)
+        api.response_listener = lambda status_code: self._on_response(account, status_code)
+        api.sender = self._send
+        with self._lock:
+            self.accounts.append(account)
+        return account
+
+    def add_account(self, username, password=None, cookie_file=None, gui_logger=None):
+        """Autentica una cuenta con cookies guardadas o, si no sirven, con usuario y contraseña"""
+        api = self.api_factory()
+        logged_in = False
+        if cookie_file:
+            logged_in = api.load_cookies(cookie_file, gui_logger)
+        if not logged_in and password:
+            logged_in = api.login(username, password, gui_logger)
+            if logged_in and cookie_file:
+                api.save_cookies(cookie_file)
+        if not logged_in:
+            if gui_logger:
+                gui_logger(f"[!] Account @{username} could not be added to the pool")
+            return False
+        self.add_api(username, api)
+        return True
+
+    def load_accounts(self, filename, gui_logger=None):
+        """Carga cuentas desde un JSON: [{"username": ..., "password": ..., "cookie_file": ...}]"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        added = 0
+        for entry in entries:
+            if self.add_account(entry['username'], entry.get('password'), entry.get('cookie_file'), gui_logger):
+                added += 1
+        return added
+
+    # --- Salud y selección ---
+
+    def _on_response(self, account, status_code):
+        with self._lock:
+            account.requests += 1
+            if status_code == 429:
+                account.throttled += 1
+                account.health = max(account.health * 0.5, 0.05)
+                account.cooldown_until = time.monotonic() + self.cooldown
+            elif status_code is None or status_code >= 500:
+                account.health = max(account.health * 0.8, 0.05)
+            elif status_code == 200:
+                account.health = min(account.health + 0.05, 1.0)
+            self._lock.notify_all()
+
+    def _acquire(self):
+        with self._lock:
+            while True:
+                if not self.accounts:
+                    raise RuntimeError("Session pool has no accounts")
+                now = time.monotonic()
+                available = [a for a in self.accounts if a.is_available(now)]
+                if available:
+                    # Más salud y menos llamadas en curso primero
+                    account = max(available, key=lambda a: a.health / (1 + a.in_flight))
+                    account.in_flight += 1
+                    return account
+                wait = min(a.cooldown_until for a in self.accounts) - now
+                self._lock.wait(timeout=max(wait, 0.1))
+
+    def _release(self, account):
+        with self._lock:
+            account.in_flight -= 1
+            self._lock.notify_all()
+
+    def _send(self, url, referer, timeout):
+        """Sender de InstagramAPI._get: cada intento sale por la cuenta disponible más sana"""
+        account = self._acquire()
+        try:
+            return account.api._send(url, referer, timeout)
+        finally:
+            self._release(account)
+
+    def _call(self, method, *args, **kwargs):
+        # El paginador corre en cualquier cuenta: sus requests pasan por _send
+        with self._lock:
+            if not self.accounts:
+                raise RuntimeError("Session pool has no accounts")
+            api = self.accounts[0].api
+        return getattr(api, method)(*args, **kwargs)
+
+    # --- Interfaz de InstagramAPI ---
+
+    @property
+    def logged_in(self):
+        return any(account.api.logged_in for account in self.accounts)
+
+    @property
+    def request_budget(self):
+        return self._request_budget
+
+    @request_budget.setter
+    def request_budget(self, budget):
+        # Un único presupuesto global compartido por todas las cuentas
+        self._request_budget = budget
+        for account in self.accounts:
+            account.api.request_budget = budget
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache):
+        # Las respuestas no dependen de la cuenta: una sola caché para todo el pool
+        self._cache = cache
+        for account in self.accounts:
+            account.api.cache = cache
+
+    def get_user_info(self, *args, **kwargs):
+        return self._call('get_user_info', *args, **kwargs)
+
+    def get_user_posts(self, *args, **kwargs):
+        return self._call('get_user_posts', *args, **kwargs)
+
+    def get_post_comments(self, *args, **kwargs):
+        return self._call('get_post_comments', *args, **kwargs)
+
+    def get_comment_replies(self, *args, **kwargs):
+        return self._call('get_comment_replies', *args, **kwargs)
+
+    def get_post_likes(self, *args, **kwargs):
+        return self._call('get_post_likes', *args, **kwargs)
+
+    def request_stats(self):
+        """Tasa total del pool y estado de cada cuenta"""
+        with self._lock:
+            now = time.monotonic()
+            accounts = [{
+                'name': a.name,
+                'health': round(a.health, 2),
+                'cooling_down': not a.is_available(now),
+                'requests': a.requests,
+                'throttled': a.throttled
+            } for a in self.accounts]
+        per_account = [a.api.request_stats() for a in self.accounts]
+        return {
+            'rate': round(sum(s['rate'] for s in per_account), 3),
+            'total_requests': sum(s['total_requests'] for s in per_account),
+            'throttled_responses': sum(s['throttled_responses'] for s in per_account),
+            'error_responses': sum(s['error_responses'] for s in per_account),
+            'accounts': accounts
+        }
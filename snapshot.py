@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Formato binario de snapshot para los datasets: cabecera versionada + marshal comprimido con zlib
+
+Uso:
+    python snapshot.py import instagram_cliniqmedellin.json [instagram_cliniqmedellin.igsnap]
+    python snapshot.py export instagram_cliniqmedellin.igsnap [instagram_cliniqmedellin.json]
+"""
+
+import argparse
+import json
+import marshal
+import os
+import struct
+import zlib
+
+from atomic_file import atomic_write
+from config import Config
+from records import to_builtin
+from user_table import denormalize_users, normalize_users
+
+MAGIC = b'IGSNAP'
+FORMAT_VERSION = 1
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+# magic, versión del formato, códec, versión de marshal, tamaño sin comprimir
+HEADER = struct.Struct('<6sBBBQ')
+MARSHAL_VERSION = 4
+
+
+class SnapshotError(Exception):
+    """El archivo no es un snapshot válido o usa una versión no soportada"""
+
+
+def dumps(data, codec=CODEC_ZLIB, level=3):
+    payload = marshal.dumps(data, MARSHAL_VERSION)
+    size = len(payload)
+    if codec == CODEC_ZLIB:
+        payload = zlib.compress(payload, level)
+    elif codec != CODEC_NONE:
+        raise SnapshotError(f"Unknown snapshot codec {codec}")
+    return HEADER.pack(MAGIC, FORMAT_VERSION, codec, MARSHAL_VERSION, size) + payload
+
+
+def loads(blob):
+    if len(blob) < HEADER.size:
+        raise SnapshotError("Truncated snapshot header")
+    magic, version, codec, marshal_version, size = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise SnapshotError("Not a snapshot file")
+    if version != FORMAT_VERSION or marshal_version > marshal.version:
+        raise SnapshotError(f"Unsupported snapshot version {version} (marshal {marshal_version})")
+
+    payload = memoryview(blob)[HEADER.size:]
+    if codec == CODEC_ZLIB:
+        payload = zlib.decompress(payload, bufsize=size)
+    elif codec != CODEC_NONE:
+        raise SnapshotError(f"Unknown snapshot codec {codec}")
+    if len(payload) != size:
+        raise SnapshotError("Snapshot payload is truncated")
+    return marshal.loads(payload)
+
+
+class SnapshotStorage:
+    """Backend de IncrementalDataManager sobre un archivo .igsnap (se reescribe entero, como el JSON)"""
+
+    def __init__(self, filename, codec=CODEC_ZLIB, level=3, normalize=None):
+        self.filename = filename
+        self.location = filename
+        self.codec = codec
+        self.level = level
+        self.normalize = Config.NORMALIZE_USERS if normalize is None else normalize
+
+    def load(self):
+        if not os.path.exists(self.filename):
+            return None
+        with open(self.filename, 'rb') as f:
+            data = loads(f.read())
+        denormalize_users(data)
+        return data
+
+    def save(self, data, dirty_post_ids=None):
+        if self.normalize:
+            data = normalize_users(data)
+        with atomic_write(self.filename, 'wb') as f:
+            f.write(dumps(to_builtin(data), self.codec, self.level))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte datasets entre JSON y snapshot binario")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="JSON -> snapshot")
+    import_parser.add_argument('source')
+    import_parser.add_argument('target', nargs='?')
+
+    export_parser = subparsers.add_parser('export', help="Snapshot -> JSON (para los scripts de análisis)")
+    export_parser.add_argument('source')
+    export_parser.add_argument('target', nargs='?')
+
+    args = parser.parse_args()
+    base = os.path.splitext(args.source)[0]
+
+    if args.command == 'import':
+        target = args.target or base + '.igsnap'
+        with open(args.source, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with atomic_write(target, 'wb') as f:
+            f.write(dumps(data))
+    else:
+        target = args.target or base + '.json'
+        with open(args.source, 'rb') as f:
+            data = loads(f.read())
+        with atomic_write(target) as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    print(f"[+] {args.source} ({os.path.getsize(args.source) / 1024:.0f} KB) -> "
+          f"{target} ({os.path.getsize(target) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+Backends de almacenamiento de los datasets: JSON (un archivo por perfil) o SQLite normalizado
+
+Uso:
+    python storage.py import instagram_cliniqmedellin.json [--db instagram_data.sqlite3]
+    python storage.py export cliniqmedellin [--db instagram_data.sqlite3] [--output instagram_cliniqmedellin.json]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+from atomic_file import atomic_write
+from config import Config
+from records import json_default
+from snapshot import SnapshotStorage
+from user_table import denormalize_users, normalize_users
+
+
+class JsonStorage:
+    """Dataset completo en instagram_{username}.json (se reescribe entero en cada guardado)"""
+
+    def __init__(self, filename, normalize=None):
+        self.filename = filename
+        self.location = filename
+        self.normalize = Config.NORMALIZE_USERS if normalize is None else normalize
+
+    def load(self):
+        """Devuelve el dataset (con los usuarios ya expandidos) o None si no existe"""
+        if not os.path.exists(self.filename):
+            return None
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        denormalize_users(data)
+        return data
+
+    def save(self, data, dirty_post_ids=None):
+        if self.normalize:
+            data = normalize_users(data)
+        with atomic_write(self.filename) as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=json_default)
+
+
+# Campos con columna propia; el resto de cada registro se guarda en la columna extra (JSON)
+POST_COLUMNS = ('id', 'code', 'media_type', 'like_count', 'comment_count', 'caption', 'taken_at', 'last_updated')
+COMMENT_COLUMNS = ('id', 'text', 'created_at', 'like_count', 'user')
+LIKE_COLUMNS = ('user_id', 'username', 'full_name', 'profile_pic_url', 'is_verified', 'is_private')
+PROFILE_COLUMNS = ('id', 'username', 'full_name', 'biography', 'profile_pic_url', 'followers_count',
+                   'following_count', 'is_private', 'is_verified', 'external_url')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT,
+    full_name TEXT,
+    profile_pic_url TEXT,
+    is_verified INTEGER,
+    is_private INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_users_username ON users (username);
+
+CREATE TABLE IF NOT EXISTS profiles (
+    username TEXT PRIMARY KEY,
+    id TEXT,
+    full_name TEXT,
+    biography TEXT,
+    profile_pic_url TEXT,
+    followers_count INTEGER,
+    following_count INTEGER,
+    is_private INTEGER,
+    is_verified INTEGER,
+    external_url TEXT,
+    last_full_scrape TEXT,
+    incremental_updates INTEGER,
+    summary TEXT
+);
+
+CREATE TABLE IF NOT EXISTS posts (
+    profile TEXT NOT NULL REFERENCES profiles (username),
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    code TEXT,
+    media_type INTEGER,
+    like_count INTEGER,
+    comment_count INTEGER,
+    caption TEXT,
+    taken_at INTEGER,
+    last_updated TEXT,
+    has_comments INTEGER NOT NULL,
+    has_likes INTEGER NOT NULL,
+    extra TEXT,
+    PRIMARY KEY (profile, id)
+);
+CREATE INDEX IF NOT EXISTS idx_posts_profile ON posts (profile, position);
+CREATE INDEX IF NOT EXISTS idx_posts_code ON posts (code);
+
+CREATE TABLE IF NOT EXISTS comments (
+    profile TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    user_id TEXT REFERENCES users (id),
+    text TEXT,
+    created_at INTEGER,
+    like_count INTEGER,
+    extra TEXT,
+    PRIMARY KEY (profile, post_id, id),
+    FOREIGN KEY (profile, post_id) REFERENCES posts (profile, id)
+);
+
+CREATE TABLE IF NOT EXISTS replies (
+    profile TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    comment_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    user_id TEXT REFERENCES users (id),
+    text TEXT,
+    created_at INTEGER,
+    like_count INTEGER,
+    extra TEXT,
+    PRIMARY KEY (profile, post_id, comment_id, id),
+    FOREIGN KEY (profile, post_id) REFERENCES posts (profile, id)
+);
+
+CREATE TABLE IF NOT EXISTS likes (
+    profile TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    username TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    user_id TEXT REFERENCES users (id),
+    profile_pic_url TEXT,
+    extra TEXT,
+    PRIMARY KEY (profile, post_id, username),
+    FOREIGN KEY (profile, post_id) REFERENCES posts (profile, id)
+);
+"""
+
+# Bases anteriores: posts, comentarios, respuestas y likes con clave global (sin el perfil).
+# Un post colaborativo aparece en el feed de dos perfiles con el mismo id, así que las
+# tablas se recrean con el perfil en la clave y se copian las filas.
+MIGRATE_PROFILE_KEYS = """
+BEGIN;
+DROP INDEX IF EXISTS idx_posts_profile;
+DROP INDEX IF EXISTS idx_posts_code;
+ALTER TABLE posts RENAME TO posts_old;
+ALTER TABLE comments RENAME TO comments_old;
+ALTER TABLE replies RENAME TO replies_old;
+ALTER TABLE likes RENAME TO likes_old;
+{schema}
+INSERT INTO posts SELECT profile, id, position, code, media_type, like_count, comment_count, caption,
+    taken_at, last_updated, has_comments, has_likes, extra FROM posts_old;
+INSERT INTO comments SELECT p.profile, c.* FROM comments_old c JOIN posts_old p ON p.id = c.post_id;
+INSERT INTO replies SELECT p.profile, r.* FROM replies_old r JOIN posts_old p ON p.id = r.post_id;
+INSERT INTO likes SELECT p.profile, l.* FROM likes_old l JOIN posts_old p ON p.id = l.post_id;
+DROP TABLE posts_old;
+DROP TABLE comments_old;
+DROP TABLE replies_old;
+DROP TABLE likes_old;
+COMMIT;
+"""
+
+
+def _bool(value):
+    return None if value is None else bool(value)
+
+
+def _extra(record, columns, overrides=None):
+    extra = {key: value for key, value in record.items() if key not in columns}
+    if overrides:
+        extra.update(overrides)
+    return json.dumps(extra, ensure_ascii=False, default=json_default) if extra else None
+
+
+class SQLiteStorage:
+    """Perfiles, posts, comentarios, respuestas y likes en tablas normalizadas de una base SQLite.
+
+    Varios perfiles comparten la misma base y la tabla de usuarios; los posts y sus
+    detalles se guardan por perfil (un post colaborativo tiene una copia en cada uno). Un guardado
+    incremental solo hace upsert de los posts modificados (dirty_post_ids) en una
+    única transacción, así que su coste depende del delta y no del histórico.
+    """
+
+    def __init__(self, filename, username):
+        self.filename = filename
+        self.username = username
+        self.location = f"{filename} (@{username})"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(filename, check_same_thread=False)
+        comment_columns = {row[1] for row in self._conn.execute("PRAGMA table_info(comments)")}
+        if comment_columns and 'profile' not in comment_columns:
+            self._conn.executescript(MIGRATE_PROFILE_KEYS.format(schema=SCHEMA))
+        self._conn.executescript(SCHEMA)
+        # Bases creadas antes de que profiles tuviera la columna summary
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(profiles)")}
+        if 'summary' not in columns:
+            self._conn.execute("ALTER TABLE profiles ADD COLUMN summary TEXT")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Lectura ---
+
+    def load(self):
+        """Reconstruye el dataset con la misma estructura que el JSON, o None si no hay datos"""
+        with self._lock:
+            conn = self._conn
+            profile_row = conn.execute(
+                f"SELECT {', '.join(PROFILE_COLUMNS)}, last_full_scrape, incremental_updates, summary "
+                "FROM profiles WHERE username = ?", (self.username,)
+            ).fetchone()
+            if profile_row is None:
+                return None
+
+            profile = dict(zip(PROFILE_COLUMNS, profile_row))
+            profile['is_private'] = _bool(profile['is_private'])
+            profile['is_verified'] = _bool(profile['is_verified'])
+
+            users = {}
+            for row in conn.execute("""
+                SELECT DISTINCT u.id, u.username, u.full_name, u.profile_pic_url, u.is_verified, u.is_private
+                FROM users u WHERE u.id IN (
+                    SELECT user_id FROM comments WHERE profile = ?
+                    UNION SELECT user_id FROM replies WHERE profile = ?
+                    UNION SELECT user_id FROM likes WHERE profile = ?
+                )""", (self.username,) * 3):
+                users[row[0]] = row
+
+            posts = []
+            posts_by_id = {}
+            for row in conn.execute(
+                f"SELECT {', '.join(POST_COLUMNS)}, has_comments, has_likes, extra "
+                "FROM posts WHERE profile = ? ORDER BY position", (self.username,)
+            ):
+                post = dict(zip(POST_COLUMNS, row[:len(POST_COLUMNS)]))
+                if post['last_updated'] is None:
+                    del post['last_updated']
+                if row[-1]:
+                    post.update(json.loads(row[-1]))
+                if row[-3]:
+                    post['comments_detailed'] = []
+                if row[-2]:
+                    post['likes_detailed'] = []
+                posts.append(post)
+                posts_by_id[post['id']] = post
+
+            comments_by_key = {}
+            for row in conn.execute("""
+                SELECT post_id, id, user_id, text, created_at, like_count, extra
+                FROM comments WHERE profile = ? ORDER BY post_id, position""", (self.username,)):
+                comment = self._comment_from_row(row[1:], users)
+                comment['replies'] = []
+                posts_by_id[row[0]].setdefault('comments_detailed', []).append(comment)
+                comments_by_key[(row[0], row[1])] = comment
+
+            for row in conn.execute("""
+                SELECT post_id, comment_id, id, user_id, text, created_at, like_count, extra
+                FROM replies WHERE profile = ? ORDER BY post_id, comment_id, position""", (self.username,)):
+                comment = comments_by_key.get((row[0], row[1]))
+                if comment is not None:
+                    comment['replies'].append(self._comment_from_row(row[2:], users))
+
+            for row in conn.execute("""
+                SELECT post_id, username, user_id, profile_pic_url, extra
+                FROM likes WHERE profile = ? ORDER BY post_id, position""", (self.username,)):
+                user = self._like_user(users.get(row[2]))
+                like = {
+                    'user_id': row[2],
+                    'username': row[1],
+                    'full_name': user['full_name'],
+                    'profile_pic_url': row[3],
+                    'is_verified': user['is_verified'],
+                    'is_private': user['is_private']
+                }
+                if row[4]:
+                    like.update(json.loads(row[4]))
+                posts_by_id[row[0]].setdefault('likes_detailed', []).append(like)
+
+        metadata = {
+            'last_full_scrape': profile_row[-3],
+            'total_posts': len(posts),
+            'incremental_updates': profile_row[-2] or 0
+        }
+        if profile_row[-1]:
+            metadata['summary'] = json.loads(profile_row[-1])
+        return {'profile': profile, 'metadata': metadata, 'posts': posts}
+
+    def _comment_from_row(self, row, users):
+        comment_id, user_id, text, created_at, like_count, extra = row
+        comment = {
+            'id': comment_id,
+            'text': text,
+            'created_at': created_at,
+            'like_count': like_count,
+            'user': self._comment_user(user_id, users.get(user_id))
+        }
+        if extra:
+            comment.update(json.loads(extra))
+        return comment
+
+    @staticmethod
+    def _like_user(user):
+        """Campos de un like que salen de la fila de users"""
+        return {
+            'full_name': user[2] if user else None,
+            'is_verified': _bool(user[4]) if user else None,
+            'is_private': _bool(user[5]) if user else None
+        }
+
+    @staticmethod
+    def _comment_user(user_id, user):
+        return {
+            'id': user_id,
+            'username': user[1] if user else None,
+            'full_name': user[2] if user else None,
+            'is_verified': _bool(user[4]) if user else None
+        }
+
+    # --- Escritura ---
+
+    def save(self, data, dirty_post_ids=None):
+        """Guarda el dataset; con dirty_post_ids solo se escriben esos posts (upsert)"""
+        posts = data.get('posts', [])
+        with self._lock, self._conn:
+            conn = self._conn
+            self._upsert_profile(conn, data.get('profile') or {}, data.get('metadata') or {})
+
+            if dirty_post_ids is None:
+                # Guardado completo: el dataset reemplaza al anterior
+                for table in ('comments', 'replies', 'likes', 'posts'):
+                    conn.execute(f"DELETE FROM {table} WHERE profile = ?", (self.username,))
+
+            if dirty_post_ids is not None:
+                front = 0
+                while front < len(posts) and posts[front]['id'] in dirty_post_ids:
+                    front += 1
+                if not any(post['id'] in dirty_post_ids for post in posts[front:]):
+                    # Merge incremental: los posts modificados van delante y el resto conserva su
+                    # orden. Se numeran por debajo del mínimo actual, así las posiciones de los
+                    # posts sin cambios no se desplazan y no hay que reescribirlas
+                    lowest = conn.execute("SELECT MIN(position) FROM posts WHERE profile = ?",
+                                          (self.username,)).fetchone()[0] or 0
+                    for offset, post in enumerate(posts[:front]):
+                        self._upsert_post(conn, post, lowest - front + offset)
+                    return
+
+            for position, post in enumerate(posts):
+                if dirty_post_ids is None or post['id'] in dirty_post_ids:
+                    self._upsert_post(conn, post, position)
+                else:
+                    # Orden arbitrario: los posts sin cambios pueden haberse desplazado
+                    conn.execute("UPDATE posts SET position = ? WHERE profile = ? AND id = ? AND position != ?",
+                                 (position, self.username, post['id'], position))
+
+    def _upsert_profile(self, conn, profile, metadata):
+        values = [profile.get(column) for column in PROFILE_COLUMNS]
+        values[0] = profile.get('id')
+        values[1] = self.username
+        conn.execute(f"""
+            INSERT INTO profiles ({', '.join(PROFILE_COLUMNS)}, last_full_scrape, incremental_updates, summary)
+            VALUES ({', '.join('?' * (len(PROFILE_COLUMNS) + 3))})
+            ON CONFLICT (username) DO UPDATE SET
+                {', '.join(f'{c} = excluded.{c}' for c in PROFILE_COLUMNS if c != 'username')},
+                last_full_scrape = excluded.last_full_scrape,
+                incremental_updates = excluded.incremental_updates,
+                summary = excluded.summary
+        """, values + [metadata.get('last_full_scrape'), metadata.get('incremental_updates'),
+                       json.dumps(metadata['summary']) if metadata.get('summary') else None])
+
+    def _upsert_user(self, conn, user_id, username, full_name=None, profile_pic_url=None,
+                     is_verified=None, is_private=None):
+        """Registra el usuario y devuelve su fila (id, username, full_name, profile_pic_url, is_verified, is_private)"""
+        if user_id is None:
+            return None
+        # Como en UserTable, el primer valor conocido de cada campo se queda en la fila; los
+        # likes y comentarios con valores distintos los guardan en su columna extra
+        conn.execute("""
+            INSERT INTO users (id, username, full_name, profile_pic_url, is_verified, is_private)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                username = COALESCE(username, excluded.username),
+                full_name = COALESCE(full_name, excluded.full_name),
+                profile_pic_url = COALESCE(profile_pic_url, excluded.profile_pic_url),
+                is_verified = COALESCE(is_verified, excluded.is_verified),
+                is_private = COALESCE(is_private, excluded.is_private)
+        """, (str(user_id), username, full_name, profile_pic_url, is_verified, is_private))
+        return conn.execute("SELECT id, username, full_name, profile_pic_url, is_verified, is_private "
+                            "FROM users WHERE id = ?", (str(user_id),)).fetchone()
+
+    def _upsert_post(self, conn, post, position):
+        conn.execute(f"""
+            INSERT INTO posts (profile, position, {', '.join(POST_COLUMNS)}, has_comments, has_likes, extra)
+            VALUES ({', '.join('?' * (len(POST_COLUMNS) + 5))})
+            ON CONFLICT (profile, id) DO UPDATE SET
+                position = excluded.position,
+                {', '.join(f'{c} = excluded.{c}' for c in POST_COLUMNS if c != 'id')},
+                has_comments = excluded.has_comments,
+                has_likes = excluded.has_likes,
+                extra = excluded.extra
+        """, [self.username, position] + [post.get(column) for column in POST_COLUMNS] + [
+            'comments_detailed' in post,
+            'likes_detailed' in post,
+            _extra(post, POST_COLUMNS + ('comments_detailed', 'likes_detailed'))
+        ])
+
+        for comment_position, comment in enumerate(post.get('comments_detailed', [])):
+            self._upsert_comment(conn, 'comments', post['id'], None, comment, comment_position)
+            for reply_position, reply in enumerate(comment.get('replies', [])):
+                self._upsert_comment(conn, 'replies', post['id'], comment['id'], reply, reply_position)
+
+        for like_position, like in enumerate(post.get('likes_detailed', [])):
+            user = self._upsert_user(conn, like.get('user_id'), like.get('username'), like.get('full_name'),
+                                     like.get('profile_pic_url'), like.get('is_verified'), like.get('is_private'))
+            stored = self._like_user(user)
+            overrides = {field: like.get(field) for field in stored if like.get(field) != stored[field]}
+            # La URL de la foto está firmada y caduca: se guarda la que se vio en cada like
+            conn.execute("""
+                INSERT INTO likes (profile, post_id, username, position, user_id, profile_pic_url, extra)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (profile, post_id, username) DO UPDATE SET
+                    position = excluded.position, user_id = excluded.user_id,
+                    profile_pic_url = excluded.profile_pic_url, extra = excluded.extra
+            """, (self.username, post['id'], like.get('username'), like_position,
+                  None if like.get('user_id') is None else str(like['user_id']),
+                  like.get('profile_pic_url'), _extra(like, LIKE_COLUMNS, overrides)))
+
+    def _upsert_comment(self, conn, table, post_id, comment_id, comment, position):
+        user = dict(comment.get('user') or {})
+        row = self._upsert_user(conn, user.get('id'), user.get('username'), user.get('full_name'),
+                                is_verified=user.get('is_verified'))
+        # Si el usuario guardado no coincide con el del comentario, el comentario conserva el suyo
+        overrides = None
+        if row is not None and self._comment_user(user.get('id'), row) != user:
+            overrides = {'user': user}
+        key_columns, key_values = ('profile', 'post_id'), (self.username, post_id)
+        if table == 'replies':
+            key_columns, key_values = ('profile', 'post_id', 'comment_id'), (self.username, post_id, comment_id)
+        conn.execute(f"""
+            INSERT INTO {table} ({', '.join(key_columns)}, id, position, user_id, text, created_at, like_count, extra)
+            VALUES ({', '.join('?' * (len(key_columns) + 7))})
+            ON CONFLICT ({', '.join(key_columns)}, id) DO UPDATE SET
+                position = excluded.position, user_id = excluded.user_id, text = excluded.text,
+                created_at = excluded.created_at, like_count = excluded.like_count, extra = excluded.extra
+        """, key_values + (
+            comment.get('id'), position, None if user.get('id') is None else str(user['id']),
+            comment.get('text'), comment.get('created_at'), comment.get('like_count'),
+            _extra(comment, COMMENT_COLUMNS + ('replies',), overrides)
+        ))
+
+    # --- Exportación ---
+
+    def export_json(self, filename):
+        """Escribe el dataset en el formato JSON que usan los scripts de análisis"""
+        data = self.load()
+        if data is None:
+            return None
+        JsonStorage(filename).save(data)
+        return data
+
+
+def open_storage(username, output_dir='.'):
+    """Backend configurado en Config.STORAGE_BACKEND para un perfil"""
+    if Config.STORAGE_BACKEND == 'sqlite':
+        return SQLiteStorage(os.path.join(output_dir, Config.SQLITE_FILE), username)
+    if Config.STORAGE_BACKEND == 'snapshot':
+        return SnapshotStorage(os.path.join(output_dir, f"instagram_{username}.igsnap"))
+    return JsonStorage(os.path.join(output_dir, f"instagram_{username}.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa y exporta datasets entre JSON y SQLite")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="Carga un instagram_<usuario>.json en la base SQLite")
+    import_parser.add_argument('json_file')
+    import_parser.add_argument('--db', default=Config.SQLITE_FILE)
+
+    export_parser = subparsers.add_parser('export', help="Exporta un perfil de la base SQLite a JSON")
+    export_parser.add_argument('username')
+    export_parser.add_argument('--db', default=Config.SQLITE_FILE)
+    export_parser.add_argument('--output', help="Por defecto instagram_<usuario>.json")
+
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        data = JsonStorage(args.json_file).load()
+        if data is None:
+            print(f"[!] File not found: {args.json_file}")
+            return
+        username = data['profile']['username']
+        storage = SQLiteStorage(args.db, username)
+        storage.save(data)
+        print(f"[+] Imported {len(data.get('posts', []))} posts of @{username} into {args.db}")
+    else:
+        output = args.output or f"instagram_{args.username}.json"
+        data = SQLiteStorage(args.db, args.username).export_json(output)
+        if data is None:
+            print(f"[!] No data for @{args.username} in {args.db}")
+            return
+        print(f"[+] Exported {len(data['posts'])} posts of @{args.username} to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Lectura en streaming de instagram_{username}.json: posts uno a uno, sin decodificar los campos que no se usan
+"""
+
+import json
+import mmap
+import re
+
+from user_table import UserTable
+
+_STRING_PATTERN = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_PLAIN_PATTERN = rb'[^"\[\]{}]*(?:' + _STRING_PATTERN + rb'[^"\[\]{}]*)*'
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_INDENT = re.compile(rb' *')
+_STRING = re.compile(_STRING_PATTERN, re.DOTALL)
+# Texto, strings completos y contenedores sin anidar (likes, listas vacías) de una sola pasada:
+# el bucle de _skip_value solo itera en los corchetes que realmente anidan
+_FLAT = re.compile(
+    rb'(?:[^"\[\]{}]+|' + _STRING_PATTERN +
+    rb'|\{' + _PLAIN_PATTERN + rb'\}|\[' + _PLAIN_PATTERN + rb'\])*',
+    re.DOTALL
+)
+
+
+def _skip_ws(buf, pos):
+    return _WHITESPACE.match(buf, pos).end()
+
+
+def _skip_value(buf, pos):
+    """Devuelve el offset donde termina el valor JSON que empieza en pos, sin decodificarlo"""
+    first = buf[pos:pos + 1]
+    if first == b'"':
+        return _STRING.match(buf, pos).end()
+    if first not in (b'{', b'['):
+        # Número, true, false o null: termina en la siguiente coma o cierre
+        end = pos
+        while buf[end:end + 1] not in (b',', b'}', b']', b''):
+            end += 1
+        return end
+    if buf[pos + 1:pos + 2] == b'\n':
+        # JSON indentado (json.dump(indent=...)): los strings no contienen saltos de línea, así que
+        # el cierre es la primera línea con la misma sangría que la línea que abre el contenedor
+        line_start = buf.rfind(b'\n', 0, pos) + 1
+        indent = _INDENT.match(buf, line_start).end() - line_start
+        closing = b'\n' + b' ' * indent + (b'}' if first == b'{' else b']')
+        end = buf.find(closing, pos) if buf[line_start + indent:line_start + indent + 1] != b'\t' else -1
+        if end != -1:
+            return end + len(closing)
+    depth = 0
+    while True:
+        char = buf[pos:pos + 1]
+        if char in (b'{', b'['):
+            depth += 1
+        elif char in (b'}', b']'):
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        elif not char:
+            raise ValueError("Unexpected end of JSON data")
+        pos = _FLAT.match(buf, pos + 1).end()
+
+
+def _count_items(buf, pos):
+    """Número de elementos de la lista que empieza en pos y offset final"""
+    pos = _skip_ws(buf, pos + 1)
+    if buf[pos:pos + 1] == b']':
+        return 0, pos + 1
+    count = 0
+    while True:
+        pos = _skip_ws(buf, _skip_value(buf, pos))
+        count += 1
+        if buf[pos:pos + 1] == b']':
+            return count, pos + 1
+        pos = _skip_ws(buf, pos + 1)
+
+
+def _iter_object(buf, pos):
+    """Recorre un objeto: produce (clave, offset del valor) y espera que el llamador devuelva el fin del valor"""
+    pos = _skip_ws(buf, pos + 1)
+    if buf[pos:pos + 1] == b'}':
+        return pos + 1
+    while True:
+        key_end = _STRING.match(buf, pos).end()
+        key = json.loads(buf[pos:key_end])
+        pos = _skip_ws(buf, key_end)
+        pos = _skip_ws(buf, pos + 1)  # ':'
+        pos = yield key, pos
+        pos = _skip_ws(buf, pos)
+        if buf[pos:pos + 1] == b'}':
+            return pos + 1
+        pos = _skip_ws(buf, pos + 1)  # ','
+
+
+def _read_object(buf, pos, exclude=(), fields=None, count=()):
+    """Decodifica un objeto aplicando la proyección. Devuelve (dict, offset final)"""
+    result = {}
+    walker = _iter_object(buf, pos)
+    try:
+        key, value_pos = next(walker)
+        while True:
+            if key in count and buf[value_pos:value_pos + 1] == b'[':
+                result[f'{key}_count'], end = _count_items(buf, value_pos)
+            elif key in exclude or (fields is not None and key not in fields):
+                end = _skip_value(buf, value_pos)
+            else:
+                end = _skip_value(buf, value_pos)
+                result[key] = json.loads(buf[value_pos:end])
+            key, value_pos = walker.send(end)
+    except StopIteration as stop:
+        return result, stop.value
+
+
+class _MappedFile:
+    def __init__(self, filename):
+        self._file = open(filename, 'rb')
+        try:
+            self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Archivo vacío: mmap no admite longitud 0
+            self.buf = b''
+
+    def close(self):
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _top_level(buf):
+    """Produce (clave, offset del valor) de las claves de primer nivel del dataset"""
+    pos = _skip_ws(buf, 0)
+    walker = _iter_object(buf, pos)
+    try:
+        key, value_pos = next(walker)
+        while True:
+            end = yield key, value_pos
+            key, value_pos = walker.send(end)
+    except StopIteration:
+        return
+
+
+def _locate(buf):
+    """Offsets de los valores de primer nivel: {clave: (inicio, fin)}"""
+    offsets = {}
+    walker = _top_level(buf)
+    try:
+        key, value_pos = next(walker)
+        while True:
+            end = _skip_value(buf, value_pos)
+            offsets[key] = (value_pos, end)
+            key, value_pos = walker.send(end)
+    except StopIteration:
+        pass
+    return offsets
+
+
+def load_header(filename):
+    """profile, metadata y número de posts, sin decodificar ningún post ni la tabla de usuarios"""
+    header = {'profile': {}, 'metadata': {}, 'total_posts': 0}
+    with _MappedFile(filename) as mapped:
+        buf = mapped.buf
+        walker = _top_level(buf)
+        try:
+            key, value_pos = next(walker)
+            while True:
+                if key == 'posts':
+                    header['total_posts'], end = _count_items(buf, value_pos)
+                elif key == 'users':
+                    end = _skip_value(buf, value_pos)
+                else:
+                    end = _skip_value(buf, value_pos)
+                    header[key] = json.loads(buf[value_pos:end])
+                key, value_pos = walker.send(end)
+        except StopIteration:
+            pass
+    return header
+
+
+def load_summary(filename):
+    """metadata['summary'] del dataset, o None. Si metadata va antes de los posts no se recorren"""
+    with _MappedFile(filename) as mapped:
+        buf = mapped.buf
+        walker = _top_level(buf)
+        try:
+            key, value_pos = next(walker)
+            while True:
+                end = _skip_value(buf, value_pos)
+                if key == 'metadata':
+                    return (json.loads(buf[value_pos:end]) or {}).get('summary')
+                key, value_pos = walker.send(end)
+        except StopIteration:
+            return None
+
+
+def iter_posts(filename, exclude=(), fields=None, count=()):
+    """Produce los posts uno a uno.
+
+    exclude: campos que se saltan sin decodificar (p. ej. 'likes_detailed', 'image_versions').
+    fields: si se indica, solo se decodifican esos campos.
+    count: listas que se sustituyen por su longitud en '<campo>_count'.
+    """
+    with PostFile(filename) as posts:
+        yield from posts.iter(exclude, fields, count)
+
+
+def _projection(exclude, fields, count):
+    count = set(count)
+    return set(exclude), set(fields) | count if fields is not None else None, count
+
+
+class PostFile:
+    """Acceso a los posts por offset: permite recorrerlos en otro orden sin cargarlos todos.
+
+    offsets() recorre el array de posts sin decodificarlo; read(offset, ...) decodifica
+    un post con la misma proyección que iter_posts.
+    """
+
+    def __init__(self, filename):
+        self._mapped = _MappedFile(filename)
+        self.buf = self._mapped.buf
+        self._top = _locate(self.buf)
+        self._users = None
+
+    def close(self):
+        self._mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _walk(self, read):
+        # Recorre el array de posts; read(pos) devuelve (valor, offset final)
+        if 'posts' not in self._top:
+            return
+        buf = self.buf
+        pos = _skip_ws(buf, self._top['posts'][0] + 1)
+        if buf[pos:pos + 1] == b']':
+            return
+        while True:
+            value, end = read(pos)
+            yield value
+            pos = _skip_ws(buf, end)
+            if buf[pos:pos + 1] == b']':
+                return
+            pos = _skip_ws(buf, pos + 1)
+
+    def offsets(self):
+        """Offset inicial de cada post, en el orden del archivo"""
+        return (start for start, _ in self.spans())
+
+    def spans(self):
+        """(inicio, fin) de cada post en el orden del archivo: buf[inicio:fin] es el JSON del post"""
+        def read(pos):
+            end = _skip_value(self.buf, pos)
+            return (pos, end), end
+        return self._walk(read)
+
+    def iter(self, exclude=(), fields=None, count=()):
+        """Posts en el orden del archivo (ver iter_posts)"""
+        projection = _projection(exclude, fields, count)
+
+        def read(pos):
+            post, end = _read_object(self.buf, pos, *projection)
+            return self._expand(post), end
+        return self._walk(read)
+
+    def users(self):
+        """UserTable del dataset (se decodifica una sola vez)"""
+        if self._users is None:
+            self._users = UserTable()
+            if 'users' in self._top:
+                start, end = self._top['users']
+                self._users = UserTable(json.loads(self.buf[start:end]))
+        return self._users
+
+    def read(self, offset, exclude=(), fields=None, count=()):
+        """Post que empieza en `offset` (de offsets()), con la proyección de iter_posts"""
+        post, _ = _read_object(self.buf, offset, *_projection(exclude, fields, count))
+        return self._expand(post)
+
+    def _expand(self, post):
+        # Los likes y comentarios que se decodifican completos necesitan la tabla de usuarios
+        if 'users' in self._top and ('likes_detailed' in post or 'comments_detailed' in post):
+            self.users().expand_post(post)
+        return post
+
+
+def load_users(filename):
+    """UserTable del dataset (vacía si no está normalizado), sin leer los posts"""
+    with PostFile(filename) as posts:
+        return posts.users()
+
+
+def load_data(filename, exclude=(), fields=None, count=()):
+    """Dataset con la estructura de json.load pero con los posts proyectados"""
+    data = load_header(filename)
+    data.pop('total_posts')
+    data['posts'] = list(iter_posts(filename, exclude, fields, count))
+    return data
@@ -0,0 +1,150 @@
+"""
+Tabla de usuarios compartida: likes y comentarios referencian a cada usuario por su id
+"""
+
+from collections.abc import Mapping
+
+# Claves de un like y del usuario de un comentario tal como los produce InstagramAPI
+LIKE_KEYS = ('user_id', 'username', 'full_name', 'profile_pic_url', 'is_verified', 'is_private')
+COMMENT_USER_KEYS = ('id', 'username', 'full_name', 'is_verified')
+USER_FIELDS = ('username', 'full_name', 'profile_pic_url', 'is_verified', 'is_private')
+
+
+class UserTable:
+    """Usuarios únicos del dataset, con objetos internados al expandir las referencias.
+
+    Cada usuario se guarda una sola vez en data['users'] (clave: id como string).
+    La normalización no pierde datos: si un like o un comentario trae un valor distinto
+    del registro (la foto de perfil firmada cambia entre ejecuciones), se guarda
+    {'ref': id, campo: valor} solo con los campos que difieren.
+    Al cargar, todas las referencias simples a un mismo usuario comparten el mismo dict,
+    así que no se deben modificar los likes ni los 'user' de los comentarios.
+    """
+
+    def __init__(self, users=None):
+        self.users = users if users is not None else {}
+        self._likes = {}
+        self._comment_users = {}
+        self._by_username = None
+
+    def __len__(self):
+        return len(self.users)
+
+    def get(self, user_id):
+        """Registro del usuario o None"""
+        return self.users.get(str(user_id))
+
+    def by_username(self, username):
+        """Registro del usuario por username (índice construido en la primera consulta)"""
+        if self._by_username is None:
+            self._by_username = {record.get('username'): key for key, record in self.users.items()}
+        key = self._by_username.get(username)
+        return None if key is None else self.users[key]
+
+    # --- Normalización ---
+
+    def _add(self, user_id, record, fields):
+        """Registra el usuario y devuelve los campos de `record` que difieren de la tabla"""
+        # El primer valor visto de cada campo (posts más recientes primero) queda en la tabla
+        stored = self.users.setdefault(str(user_id), {})
+        differing = {}
+        for field in fields:
+            if field not in stored:
+                stored[field] = record[field]
+            elif stored[field] != record[field]:
+                differing[field] = record[field]
+        self._by_username = None
+        return differing
+
+    def _ref(self, user_id, record, fields):
+        differing = self._add(user_id, record, fields)
+        return dict(ref=user_id, **differing) if differing else user_id
+
+    def ref_like(self, like):
+        """Sustituye un like por una referencia a su usuario (si no trae campos propios)"""
+        if not isinstance(like, Mapping):
+            return like
+        user_id = like.get('user_id')
+        if user_id is None or set(like) != set(LIKE_KEYS):
+            return like
+        return self._ref(user_id, like, USER_FIELDS)
+
+    def ref_comment(self, comment):
+        """Copia del comentario (y sus respuestas) con el usuario como referencia"""
+        comment = dict(comment)
+        user = comment.get('user')
+        if isinstance(user, Mapping) and user.get('id') is not None and set(user) == set(COMMENT_USER_KEYS):
+            comment['user'] = self._ref(user['id'], user, COMMENT_USER_KEYS[1:])
+        if comment.get('replies'):
+            comment['replies'] = [self.ref_comment(reply) for reply in comment['replies']]
+        return comment
+
+    def ref_post(self, post):
+        """Copia del post con likes y comentarios referenciando la tabla"""
+        if 'likes_detailed' not in post and 'comments_detailed' not in post:
+            return post
+        post = dict(post)
+        if 'likes_detailed' in post:
+            post['likes_detailed'] = [self.ref_like(like) for like in post['likes_detailed']]
+        if 'comments_detailed' in post:
+            post['comments_detailed'] = [self.ref_comment(comment) for comment in post['comments_detailed']]
+        return post
+
+    # --- Expansión (con internado) ---
+
+    def _expand(self, user_id, id_key, fields, overrides=()):
+        record = self.users.get(str(user_id), {})
+        expanded = {id_key: user_id}
+        expanded.update((field, overrides[field] if field in overrides else record.get(field)) for field in fields)
+        return expanded
+
+    def like(self, ref):
+        if isinstance(ref, Mapping):
+            return self._expand(ref['ref'], 'user_id', USER_FIELDS, ref) if 'ref' in ref else ref
+        like = self._likes.get(ref)
+        if like is None:
+            like = self._likes[ref] = self._expand(ref, 'user_id', USER_FIELDS)
+        return like
+
+    def comment_user(self, ref):
+        if isinstance(ref, Mapping):
+            return self._expand(ref['ref'], 'id', COMMENT_USER_KEYS[1:], ref) if 'ref' in ref else ref
+        user = self._comment_users.get(ref)
+        if user is None:
+            user = self._comment_users[ref] = self._expand(ref, 'id', COMMENT_USER_KEYS[1:])
+        return user
+
+    def expand_comment(self, comment):
+        if 'user' in comment:
+            comment['user'] = self.comment_user(comment['user'])
+        for reply in comment.get('replies') or []:
+            self.expand_comment(reply)
+        return comment
+
+    def expand_post(self, post):
+        """Expande en su lugar las referencias de un post cargado"""
+        if isinstance(post.get('likes_detailed'), list):
+            post['likes_detailed'] = [self.like(ref) for ref in post['likes_detailed']]
+        if isinstance(post.get('comments_detailed'), list):
+            for comment in post['comments_detailed']:
+                self.expand_comment(comment)
+        return post
+
+
+def normalize_users(data):
+    """Copia del dataset con los usuarios en una tabla 'users' (al final)"""
+    table = UserTable(dict(data.get('users') or {}))
+    result = {key: value for key, value in data.items() if key not in ('posts', 'users')}
+    result['posts'] = [table.ref_post(post) for post in data.get('posts', [])]
+    # users al final: metadata (con el resumen) queda antes de los posts y se lee sin recorrerlos
+    result['users'] = table.users
+    return result
+
+
+def denormalize_users(data):
+    """Expande en su lugar las referencias de un dataset normalizado y devuelve su UserTable"""
+    table = UserTable(data.pop('users', None) or {})
+    if table.users:
+        for post in data.get('posts', []):
+            table.expand_post(post)
+    return table